@@ -8,7 +8,20 @@ ChemistryLab Init Registration File
 :history: 2020-07-03
 '''
 
-from gymnasium.envs.registration import register
+from functools import partial
+from gymnasium.envs.registration import register as _register
+
+
+def _make_vector(entry_point, num_envs=1, max_episode_steps=None, **kwargs):
+    """Vector entry point used by ``gymnasium.make_vec(id, num_envs, vectorization_mode="custom")``"""
+    from chemistrylab.benches.vector_bench import GenBenchVector
+    return GenBenchVector(entry_point, num_envs, max_episode_steps, kwargs)
+
+def register(id, entry_point, kwargs=None, vectorize=True, **options):
+    """Registers an environment along with a GenBenchVector vector entry point"""
+    kwargs = {} if kwargs is None else kwargs
+    vector_entry_point = partial(_make_vector, entry_point, **kwargs) if vectorize else None
+    _register(id=id, entry_point=entry_point, vector_entry_point=vector_entry_point, kwargs=kwargs, **options)
 
 ############################ ExtractBench ####################################
 
@@ -53,7 +66,8 @@ register(
 register(
     id='LabManager-v0',
     entry_point='chemistrylab.manager.manager:LabManager',
-    max_episode_steps=100
+    max_episode_steps=100,
+    vectorize=False
 )
 
 
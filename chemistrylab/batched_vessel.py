@@ -0,0 +1,737 @@
+"""
+A vectorized counterpart to :class:`~chemistrylab.vessel.Vessel` which holds the state of N vessels
+in stacked arrays and applies events to all of them at once with compiled kernels.
+"""
+from typing import Tuple, Optional, List
+from copy import copy
+import numpy as np
+import numba
+from numba import prange
+
+from chemistrylab import material
+from chemistrylab.vessel import Vessel, Event, _validate_dissolved, _boil_off, _drain, layer_values
+from chemistrylab.extract_algorithms import separate
+
+C_AIR = 1.2292875 #Heat capacity of air in J/L*K (near STP)
+D_AIR = 1.225 #Density of air in g/L
+COLOR_AIR = 0.65 #Chosen color of air
+
+
+@numba.jit(nopython=True, cache=True)
+def _filled_volume(mol, phase, present, molar_mass, density):
+    """Returns the volume (in litres) of the materials in one vessel (see Vessel.filled_volume)"""
+    vol = 0.0
+    for c in range(mol.shape[0]):
+        if present[c]:
+            vol += 1e-3*mol[c]*molar_mass[c]/density[c, phase[c]]
+    return vol
+
+
+@numba.jit(nopython=True, cache=True)
+def _heat_capacity(volume, mol, present, molar_mass, specific_heat):
+    """Returns the heat capacity (in J/K) of one vessel (see Vessel.heat_capacity)"""
+    hc = volume*C_AIR
+    for c in range(mol.shape[0]):
+        if present[c]:
+            hc += mol[c]*molar_mass[c]*specific_heat[c]
+    return hc
+
+
+@numba.jit(nopython=True, cache=True)
+def _commit(b, mol, phase, present, dissolved, had_solvent, volume, sol_cols, is_solute,
+            molar_mass, density, lpos, lvar, lvprev):
+    """
+    Performs validate_solvents, validate_solutes and _handle_overflow on vessel b.
+
+    Args:
+        b (int): The index of the vessel
+        had_solvent (array): Which solvents were in the vessel before the event (1D bool, size M)
+        molar_mass, density (array): The properties of vessel b (molar_mass[b] and density[b] of the batch)
+        *: See BatchedVessel
+
+    Returns:
+        int: -1 if the vessel overflowed and 0 otherwise
+    """
+    solvent_mol = np.zeros(sol_cols.shape[0])
+    n_solvents = 0
+    changed = False
+    for k in range(sol_cols.shape[0]):
+        c = sol_cols[k]
+        if present[b, c]:
+            n_solvents += 1
+            solvent_mol[k] = mol[b, c]
+            if not had_solvent[k]:
+                changed = True
+                # A new solvent starts out with no variance or volume
+                lvar[b, c] = 0
+                lvprev[b, c] = 0
+    if changed:
+        lpos[b, :] = 0
+    if n_solvents > 0:
+        solute_mask = present[b] & is_solute
+        _validate_dissolved(mol[b], solute_mask, solvent_mol, dissolved[b])
+    # Overflow
+    filled = _filled_volume(mol[b], phase[b], present[b], molar_mass, density)
+    if filled > volume[b]:
+        ratio = volume[b]/filled
+        mol[b] *= ratio
+        dissolved[b] *= ratio
+        return -1
+    return 0
+
+
+@numba.jit(nopython=True, cache=True)
+def _add_column(b, c, phase, tphase, tpresent, tprops, tdefaults):
+    """
+    Adds column c to the target vessel b (if it is not there yet). Like Material.ration, the new material
+    has the phase it has in the source vessel and the default properties of its class.
+    """
+    if tpresent[b, c]: return
+    tpresent[b, c] = True
+    tphase[b, c] = phase[b, c]
+    tprops[0][b, c] = tdefaults[0][c]
+    tprops[1][b, c, :] = tdefaults[1][c, :]
+    tprops[2][b, c] = tdefaults[2][c]
+    tprops[3][b, c] = tdefaults[3][c]
+    tprops[4][b, c] = tdefaults[4][c]
+    tprops[5][b, c] = tdefaults[5][c]
+    tprops[6][b, c] = tdefaults[6][c]
+
+
+@numba.jit(nopython=True, cache=True)
+def _move(b, c, amount, mol, phase, tmol, tphase, tpresent, tprops, tdefaults):
+    """Moves `amount` mol of column c from vessel b to the target vessel b"""
+    _add_column(b, c, phase, tphase, tpresent, tprops, tdefaults)
+    tmol[b, c] += amount
+    mol[b, c] -= amount
+
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _pour_by_percent(fraction, mol, phase, present, dissolved,
+                     tmol, tphase, tpresent, tdissolved, tvolume, tlpos, tlvar, tlvprev, tprops, tdefaults,
+                     sol_cols, is_solute):
+    status = np.zeros(mol.shape[0], dtype=np.int64)
+    for b in prange(mol.shape[0]):
+        frac = fraction[b]
+        if frac < 1e-16: continue
+        frac = min(max(frac, 0.0), 1.0)
+        had_solvent = tpresent[b][sol_cols].copy()
+        has_solvent = present[b][sol_cols].any()
+        for c in range(mol.shape[1]):
+            if not present[b, c]: continue
+            if is_solute[c] and has_solvent:
+                dissolved[b, c] *= (1-frac)
+            _move(b, c, mol[b, c]*frac, mol, phase, tmol, tphase, tpresent, tprops, tdefaults)
+        status[b] = _commit(b, tmol, tphase, tpresent, tdissolved, had_solvent, tvolume, sol_cols,
+                            is_solute, tprops[0][b], tprops[1][b], tlpos, tlvar, tlvprev)
+    return status
+
+
+@numba.jit(nopython=True, cache=True)
+def _volume_fractions(volume, mol, phase, present, molar_mass, density):
+    """Turns an array of volumes to pour into an array of fractions (see Vessel._pour_by_volume)"""
+    fraction = np.zeros(mol.shape[0])
+    for b in range(mol.shape[0]):
+        filled = _filled_volume(mol[b], phase[b], present[b], molar_mass[b], density[b])
+        if filled < 1e-12: continue
+        fraction[b] = min(max(volume[b]/filled, 0.0), 1.0)
+    return fraction
+
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _drain_by_pixel(n_pixel, hashed, layers_volume, mol, phase, present, dissolved,
+                    tmol, tphase, tpresent, tdissolved, tvolume, tlpos, tlvar, tlvprev, tprops, tdefaults,
+                    sol_cols, is_solute):
+    status = np.zeros(mol.shape[0], dtype=np.int64)
+    tot_pixels = hashed.shape[1]
+    for b in prange(mol.shape[0]):
+        had_solvent = tpresent[b][sol_cols].copy()
+        n = min(max(n_pixel[b], 0), tot_pixels)
+        drained = np.zeros(mol.shape[1])
+        moved = np.zeros(mol.shape[1], dtype=np.int64)
+        # Layers are indexed by column here
+        _drain(hashed[b, :n], tot_pixels, layers_volume[b], sol_cols, sol_cols, present[b] & is_solute,
+               mol[b], dissolved[b], drained, moved)
+        for c in range(mol.shape[1]):
+            if moved[c] == 0: continue
+            _add_column(b, c, phase, tphase, tpresent, tprops, tdefaults)
+            tmol[b, c] += drained[c]
+        status[b] = _commit(b, tmol, tphase, tpresent, tdissolved, had_solvent, tvolume, sol_cols,
+                            is_solute, tprops[0][b], tprops[1][b], tlpos, tlvar, tlvprev)
+    return status
+
+
+@numba.jit(nopython=True, parallel=True, cache=True, error_model="numpy")
+def _heat_contact(Tf, ht, temperature, volume, mol, phase, present, dissolved,
+                  tmol, tphase, tpresent, tdissolved, tvolume, tlpos, tlvar, tlvprev, tprops, tdefaults,
+                  sol_cols, is_solute, props):
+    """
+    See Vessel._heat_contact, a NaN value in Tf means ht is used as heat (change heat).
+    """
+    molar_mass, specific_heat, boiling_point, enthalpy_vapor = props[0], props[2], props[3], props[4]
+    status = np.zeros(mol.shape[0], dtype=np.int64)
+    for b in prange(mol.shape[0]):
+        use_dQ = np.isnan(Tf[b])
+        T0 = temperature[b]
+        tf = T0+1 if use_dQ else Tf[b]
+        total = 0.0
+        for c in range(mol.shape[1]):
+            if present[b, c]:
+                total += mol[b, c]
+        if total < 1e-12:
+            x = -ht[b]/_heat_capacity(volume[b], mol[b], present[b], molar_mass[b], specific_heat[b])
+            temperature[b] = tf+(T0-tf)*((1+x) if use_dQ else np.exp(x))
+            status[b] = 0 if tf < 373 else -1
+            continue
+        had_solvent = tpresent[b][sol_cols].copy()
+        cols = np.where(present[b])[0]
+        order = cols[np.argsort(boiling_point[b][cols], kind="mergesort")]
+        boiled = np.zeros(mol.shape[1])
+        T, n_boiled = _boil_off(T0, tf, ht[b], use_dQ, volume[b]*C_AIR, mol[b], order, molar_mass[b],
+                                specific_heat[b], boiling_point[b], enthalpy_vapor[b], boiled)
+        for i in range(n_boiled):
+            c = order[i]
+            _add_column(b, c, phase, tphase, tpresent, tprops, tdefaults)
+            tmol[b, c] += boiled[c]
+        temperature[b] = T
+        # validate the solutes left behind
+        solvent_mol = np.zeros(sol_cols.shape[0])
+        for k in range(sol_cols.shape[0]):
+            if present[b, sol_cols[k]]:
+                solvent_mol[k] = mol[b, sol_cols[k]]
+        if present[b][sol_cols].any():
+            _validate_dissolved(mol[b], present[b] & is_solute, solvent_mol, dissolved[b])
+        status[b] = _commit(b, tmol, tphase, tpresent, tdissolved, had_solvent, tvolume, sol_cols,
+                            is_solute, tprops[0][b], tprops[1][b], tlpos, tlvar, tlvprev)
+    return status
+
+
+@numba.jit(nopython=True, cache=True)
+def _layer_columns(b, mol, present, sol_cols, is_solute, is_solvent):
+    """
+    Returns the columns making up the layers of vessel b (solvents first, then any other
+    undissolved materials), as well as the indices of the present solvents in sol_cols
+    """
+    solvent_k = np.zeros(sol_cols.shape[0], dtype=np.int64)
+    n_solvents = 0
+    solvent_total = 0.0
+    for k in range(sol_cols.shape[0]):
+        if present[b, sol_cols[k]]:
+            solvent_k[n_solvents] = k
+            n_solvents += 1
+            solvent_total += mol[b, sol_cols[k]]
+    solute_flag = solvent_total <= 1e-12
+    cols = np.zeros(mol.shape[1], dtype=np.int64)
+    for i in range(n_solvents):
+        cols[i] = sol_cols[solvent_k[i]]
+    n = n_solvents
+    for c in range(mol.shape[1]):
+        if present[b, c] and (not is_solvent[c]) and (solute_flag or not is_solute[c]):
+            cols[n] = c
+            n += 1
+    return cols[:n], solvent_k[:n_solvents]
+
+
+@numba.jit(nopython=True, cache=True)
+def _mix_vessel(b, t, volume, mol, phase, present, dissolved, lpos, lvar, lvprev, layers_volume, lvar_disp, variance,
+                sol_cols, is_solute, is_solvent, molar_mass, density, polarity):
+    """Mixes vessel b (see _mix)"""
+    air = mol.shape[1]
+    cols, solvent_k = _layer_columns(b, mol, present, sol_cols, is_solute, is_solvent)
+    n = cols.shape[0]
+    ns = solvent_k.shape[0]
+    v = np.zeros(n+1, dtype=np.float32)
+    d = np.zeros(n+1, dtype=np.float32)
+    vprev = np.zeros(n+1, dtype=np.float32)
+    B = np.zeros(n+1, dtype=np.float32)
+    C = np.zeros(n+1, dtype=np.float32)
+    tot = 0.0
+    for i in range(n):
+        c = cols[i]
+        vol = 1e-3*mol[b, c]*molar_mass[b, c]/density[b, c, phase[b, c]]
+        v[i] = vol
+        tot += vol
+        d[i] = density[b, c, phase[b, c]]*1000
+        vprev[i] = lvprev[b, c]
+        B[i] = lpos[b, c]
+        C[i] = lvar[b, c]
+    # Overfilled stock vessels would otherwise get a negative amount of air
+    v[n] = max(volume[b]-tot, 0.0)
+    d[n] = D_AIR
+    vprev[n] = lvprev[b, air]
+    B[n] = lpos[b, air]
+    C[n] = lvar[b, air]
+    # Solutes only have rows once there are solvents
+    n_solutes = 0
+    solute_cols = np.zeros(mol.shape[1], dtype=np.int64)
+    if ns > 0:
+        for c in range(mol.shape[1]):
+            if present[b, c] and is_solute[c]:
+                solute_cols[n_solutes] = c
+                n_solutes += 1
+    S = np.zeros((n_solutes, ns), dtype=np.float32)
+    spol = np.zeros(n_solutes, dtype=np.float32)
+    svol = np.zeros(n_solutes, dtype=np.float32)
+    for i in range(n_solutes):
+        u = solute_cols[i]
+        spol[i] = polarity[b, u]
+        svol[i] = 1e-3*molar_mass[b, u]/density[b, u, phase[b, u]]
+        for j in range(ns):
+            S[i, j] = dissolved[b, u, solvent_k[j]]
+    lpol = np.zeros(ns, dtype=np.float32)
+    for j in range(ns):
+        lpol[j] = polarity[b, sol_cols[solvent_k[j]]]
+
+    B1, v_layer, C1, C0, S1, var_layer = separate.mix(v, vprev, svol, B, C, variance[b], d, spol, lpol, S, t)
+
+    variance[b] = C0
+    for i in range(n+1):
+        c = cols[i] if i < n else air
+        lpos[b, c] = B1[i]
+        lvar[b, c] = C1[i]
+        lvprev[b, c] = v[i]
+        layers_volume[b, c] = v_layer[i]
+        lvar_disp[b, c] = var_layer[i]
+    for i in range(n_solutes):
+        for j in range(ns):
+            dissolved[b, solute_cols[i], solvent_k[j]] = S1[i, j]
+
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _mix(t, mask, volume, mol, phase, present, dissolved, lpos, lvar, lvprev, layers_volume, lvar_disp, variance,
+         sol_cols, is_solute, is_solvent, molar_mass, density, color, polarity):
+    """See Vessel._mix, layer information is stored by column (with air in the last column)"""
+    for b in prange(mol.shape[0]):
+        if mask[b]:
+            # The per-vessel body lives in its own function since the parfor pass
+            # miscompiles separate.mix's results being assigned back to loop locals
+            _mix_vessel(b, np.float32(t[b]), volume, mol, phase, present, dissolved, lpos, lvar, lvprev,
+                        layers_volume, lvar_disp, variance, sol_cols, is_solute, is_solvent, molar_mass,
+                        density, polarity)
+
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _update_layers(mask, mol, present, layers_volume, lpos, lvar_disp, layers, hashed,
+                   sol_cols, is_solute, is_solvent, color, x):
+    """See Vessel._update_layers, hashed layers are stored as column indices (air is the last column)"""
+    air = mol.shape[1]
+    for b in prange(mol.shape[0]):
+        if not mask[b]: continue
+        cols, solvent_k = _layer_columns(b, mol, present, sol_cols, is_solute, is_solvent)
+        n = cols.shape[0]
+        A = np.zeros(n+1, dtype=np.float32)
+        B = np.zeros(n+1, dtype=np.float32)
+        C = np.zeros(n+1, dtype=np.float32)
+        colors = np.zeros(n+1, dtype=np.float32)
+        for i in range(n+1):
+            c = cols[i] if i < n else air
+            A[i] = layers_volume[b, c]
+            B[i] = lpos[b, c]
+            C[i] = lvar_disp[b, c]
+            colors[i] = color[b, c] if i < n else COLOR_AIR
+        L, L2 = separate.map_to_state(A, B, C, colors, x)
+        layers[b] = L
+        for i in range(L2.shape[0]):
+            hashed[b, i] = cols[L2[i]] if L2[i] < n else air
+
+
+def _as_array(value, n, dtype=np.float64):
+    """Broadcasts an event parameter to one value per vessel"""
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=dtype), (n,)))
+
+
+class BatchedVessel:
+    """
+    Stores N vessels as stacked arrays and applies events to all of them in parallel. Every vessel in
+    a batch (and any batch used as a target) shares the same set of material columns.
+
+    These are the event functions, each takes one parameter per vessel (scalars are broadcast):
+
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    | Event Name       | Method                                              | Event Parameters                        |
+    +==================+=====================================================+=========================================+
+    |  pour by volume  | :meth:`~BatchedVessel.pour_by_volume`               |   volume (:class:`numpy.ndarray`)       |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  pour by percent | :meth:`~BatchedVessel.pour_by_percent`              |   fraction (:class:`numpy.ndarray`)     |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  drain by pixel  | :meth:`~BatchedVessel.drain_by_pixel`               |   n_pixel (:class:`numpy.ndarray`)      |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  mix             | :meth:`~BatchedVessel.mix`                          |   t (:class:`numpy.ndarray`)            |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  update layer    | :meth:`~BatchedVessel.update_layers`                |                                         |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  change heat     | :meth:`~BatchedVessel.change_heat`                  |   dQ (:class:`numpy.ndarray`)           |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+    |  heat contact    | :meth:`~BatchedVessel.heat_contact`                 | Tf (array), ht (array)                  |
+    +------------------+-----------------------------------------------------+-----------------------------------------+
+
+    The material properties used by the events (molar mass, density, specific heat, boiling point, enthalpy of
+    vaporization, color and polarity) are stored per vessel, so vessels can hold materials with their own
+    properties under the same name. Like :meth:`~chemistrylab.material.Material.ration`, a material moved
+    into a vessel which does not have it yet gets the default properties of its class. The solute and solvent
+    flags are stored once per column, so they must be the same in every vessel.
+
+    Args:
+        templates (Tuple[Material]): One Material for each column (amounts are ignored)
+        n (int): The number of vessels in the batch
+        label (str): Name for the batch of vessels
+        temperature (float): Temperature of the vessels in Kelvin
+        volume (float): Volume of the vessels in Litres
+        ignore_layout (bool): Set to true to skip layer calculations (like Vessel)
+    """
+
+    def __init__(
+            self,
+            templates: Tuple[material.Material],
+            n: int = 1,
+            label: str = "",
+            temperature: float = 297.0,
+            volume: float = 1.0,
+            ignore_layout: bool = False,
+        ):
+        self.label = label
+        self.n = n
+        self.ignore_layout = ignore_layout
+        self.default_dt = 0.01
+        #Column information (templates are copied so they don't hold on to any vessels)
+        self._templates = tuple(copy(mat) for mat in templates)
+        for mat,orig in zip(self._templates, templates):
+            mat._vessel, mat._slot, mat._mol, mat._phase = None, -1, 0.0, int(orig.phase_code)
+            mat._polarity = float(orig.polarity)
+        self.species = tuple(mat._name for mat in self._templates)
+        self.species_ids = np.array([material.get_species_id(key) for key in self.species], dtype=np.int32)
+        cols = len(self.species)
+        #Material properties by [vessel, column], every vessel starts out with the properties of the templates
+        self.molar_mass = np.zeros([n, cols], dtype=np.float64)
+        # Density indexed by [vessel, column, phase code] (nan for phases the material can't be in)
+        self.density = np.full([n, cols, len(material.PHASES)], np.nan)
+        self.specific_heat = np.zeros([n, cols], dtype=np.float64)
+        self.boiling_point = np.zeros([n, cols], dtype=np.float64)
+        self.enthalpy_vapor = np.zeros([n, cols], dtype=np.float64)
+        self.color = np.zeros([n, cols], dtype=np.float64)
+        self.polarity = np.zeros([n, cols], dtype=np.float64)
+        for c,mat in enumerate(self._templates):
+            self._set_properties(slice(None), c, mat)
+        # The properties materials are given when they are moved into a vessel without them (see _add_column)
+        defaults = [type(mat)() for mat in self._templates]
+        self._default_properties = (
+            np.array([mat._molar_mass for mat in defaults], dtype=np.float64),
+            np.array([[np.nan if d is None else d for d in mat._record.density] for mat in defaults],
+                     dtype=np.float64).reshape(cols, len(material.PHASES)),
+            np.array([mat._specific_heat or 0.0 for mat in defaults], dtype=np.float64),
+            np.array([mat._boiling_point for mat in defaults], dtype=np.float64),
+            np.array([mat._enthalpy_vapor for mat in defaults], dtype=np.float64),
+            np.array([mat._color for mat in defaults], dtype=np.float64),
+            np.array([mat.polarity for mat in defaults], dtype=np.float64),
+        )
+        self.is_solute = np.array([mat.is_solute() for mat in self._templates], dtype=np.bool_)
+        self.is_solvent = np.array([mat.is_solvent() for mat in self._templates], dtype=np.bool_)
+        self.sol_cols = np.where(self.is_solvent)[0].astype(np.int64)
+        #Vessel state
+        self.temperature = np.full(n, temperature, dtype=np.float64)
+        self.volume = np.full(n, volume, dtype=np.float64)
+        self.mol = np.zeros([n, cols], dtype=np.float64)
+        self.phase = np.tile(np.array([mat.phase_code for mat in self._templates], dtype=np.int8), (n, 1))
+        self.present = np.zeros([n, cols], dtype=np.bool_)
+        self.dissolved = np.zeros([n, cols, len(self.sol_cols)], dtype=np.float32)
+        #Layer state by column (the last column is air)
+        self._layers_position = np.zeros([n, cols+1], dtype=np.float32)
+        self._layers_variance = np.zeros([n, cols+1], dtype=np.float32)
+        self._layers_variance[:, -1] = self.volume/3.46
+        self._layer_volumes = np.zeros([n, cols+1], dtype=np.float32)
+        self._layer_volumes[:, -1] = self.volume
+        self._layers_volume = self._layer_volumes.copy()
+        self._lvar = self._layers_variance.copy()
+        self._variance = np.full(n, 1e-5, dtype=np.float32)
+        self._layers = np.full([n, 100], COLOR_AIR, dtype=np.float32)
+        self._hashed_layers = np.full([n, 100], cols, dtype=np.int32)
+
+    def __repr__(self):
+        return f"{self.label} (x{self.n})"
+
+    def _set_properties(self, b, c, mat: material.Material):
+        """Copies the properties of a material into column c of vessel b"""
+        self.molar_mass[b, c] = mat._molar_mass
+        self.density[b, c] = [np.nan if d is None else d for d in mat._record.density]
+        self.specific_heat[b, c] = mat._specific_heat or 0.0
+        self.boiling_point[b, c] = mat._boiling_point
+        self.enthalpy_vapor[b, c] = mat._enthalpy_vapor
+        self.color[b, c] = mat._color
+        self.polarity[b, c] = mat.polarity
+
+    def _get_material(self, b, c) -> material.Material:
+        """Returns a copy of the column template with the properties of column c in vessel b"""
+        mat = copy(self._templates[c])
+        record = mat._record
+        mat._record = record._replace(
+            molar_mass=float(self.molar_mass[b, c]),
+            density=tuple(None if np.isnan(d) else float(d) for d in self.density[b, c]),
+            specific_heat=None if (record.specific_heat is None and self.specific_heat[b, c] == 0) else float(self.specific_heat[b, c]),
+            boiling_point=float(self.boiling_point[b, c]),
+            enthalpy_vapor=float(self.enthalpy_vapor[b, c]),
+            color=float(self.color[b, c]),
+        )
+        mat._polarity = float(self.polarity[b, c])
+        mat._mol = float(self.mol[b, c])
+        mat._phase = int(self.phase[b, c])
+        return mat
+
+    def _properties(self):
+        """The per-vessel material properties in the order the kernels expect them (see _add_column)"""
+        return (self.molar_mass, self.density, self.specific_heat, self.boiling_point, self.enthalpy_vapor,
+                self.color, self.polarity)
+
+    def __len__(self):
+        return self.n
+
+    @staticmethod
+    def from_vessels(vessels: Tuple[Vessel], species: Optional[Tuple[str]] = None, label: Optional[str] = None):
+        """
+        Stacks the state of a list of vessels.
+
+        Args:
+            vessels (Tuple[Vessel]): The vessels to stack
+            species (Optional[Tuple[str]]): The material columns to use (defaults to every material in the vessels).
+                Use the same columns for batches which pour into each other.
+            label (Optional[str]): Name of the batch (defaults to the label of the first vessel)
+
+        Returns:
+            BatchedVessel: A batch holding a copy of each vessel's state (and material properties)
+
+        Raises:
+            ValueError: If a material is a solute (or solvent) in some vessels but not others
+        """
+        templates = dict()
+        for v in vessels:
+            for key,mat in v.material_dict.items():
+                if key not in templates:
+                    templates[key] = mat
+        if species is None:
+            species = tuple(templates)
+        templates = [templates[key] if key in templates else material.REGISTRY[key]() for key in species]
+        ignore_layout = all(v.ignore_layout for v in vessels)
+        batch = BatchedVessel(templates, len(vessels), vessels[0].label if label is None else label,
+                              ignore_layout=ignore_layout)
+        col = {key:c for c,key in enumerate(batch.species)}
+        sol = {c:k for k,c in enumerate(batch.sol_cols)}
+        air = len(batch.species)
+        for b,v in enumerate(vessels):
+            batch.temperature[b] = v.temperature
+            batch.volume[b] = v.volume
+            n = len(v.material_dict)
+            slots = np.array([col[key] for key in v.material_dict], dtype=np.int64)
+            for c,mat in zip(slots, v.material_dict.values()):
+                if mat.is_solute() != batch.is_solute[c] or mat.is_solvent() != batch.is_solvent[c]:
+                    raise ValueError(f"{mat._name} does not have the same solute and solvent flags in every vessel")
+                batch._set_properties(b, c, mat)
+            batch.mol[b, slots] = v._mol[:n]
+            batch.phase[b, slots] = v._phase[:n]
+            batch.present[b, slots] = True
+            for key,arr in v.solute_dict.items():
+                for j,solvent in enumerate(v.solvents):
+                    batch.dissolved[b, col[key], sol[col[solvent]]] = arr[j]
+            batch._variance[b] = v._variance
+            # Layer arrays are either indexed by the last set of layer materials or just the solvents
+            layer_keys = [mat._name for mat in v._layer_mats]
+            if len(v._layers_position) != len(layer_keys)+1:
+                layer_keys = list(v.solvents)
+            layer_cols = np.array([col[key] for key in layer_keys]+[air], dtype=np.int64)
+            for arr,out in ((v._layers_position, batch._layers_position),
+                            (v._layers_variance, batch._layers_variance),
+                            (v._layer_volumes, batch._layer_volumes)):
+                m = min(len(arr), len(layer_cols))
+                out[b, layer_cols[:m-1]] = arr[:m-1]
+                out[b, air] = arr[-1]
+            if v._layers is not None:
+                layer_cols = np.array([col[mat._name] for mat in v._layer_mats]+[air], dtype=np.int64)
+                batch._layers_volume[b, layer_cols] = v._layers_volume
+                batch._lvar[b, layer_cols] = v._lvar
+                batch._layers[b] = v._layers
+                batch._hashed_layers[b] = layer_cols[v._hashed_layers]
+        return batch
+
+    def get_vessel(self, b: int) -> Vessel:
+        """
+        Args:
+            b (int): The index of the vessel in the batch
+
+        Returns:
+            Vessel: A new Vessel with a copy of the state of vessel b
+        """
+        v = Vessel(self.label, temperature=float(self.temperature[b]), volume=float(self.volume[b]),
+                   ignore_layout=self.ignore_layout)
+        v.default_dt = self.default_dt
+        materials = {self.species[c]:self._get_material(b, c) for c in np.where(self.present[b])[0]}
+        v.material_dict = materials
+        v.solvents = tuple(self.species[c] for c in self.sol_cols if self.present[b, c])
+        v.solvent_dict = {key:i for i,key in enumerate(v.solvents)}
+        sol_k = [k for k,c in enumerate(self.sol_cols) if self.present[b, c]]
+        if len(v.solvents) > 0:
+            v.solute_dict = {self.species[c]:self.dissolved[b, c, sol_k]
+                for c in np.where(self.present[b] & self.is_solute)[0]}
+        cols = [self.species.index(key) for key in v.solvents]+[len(self.species)]
+        v._layers_position = self._layers_position[b, cols].copy()
+        v._layers_variance = self._layers_variance[b, cols].copy()
+        v._layer_volumes = self._layer_volumes[b, cols].copy()
+        v._variance = self._variance[b]
+        return v
+
+    def to_vessels(self) -> List[Vessel]:
+        """
+        Returns:
+            List[Vessel]: A new Vessel for each vessel in the batch
+        """
+        return [self.get_vessel(b) for b in range(self.n)]
+
+    def filled_volume(self):
+        """
+        Returns:
+            np.ndarray: The volume of all non-gas phase materials in each vessel (in Litres).
+        """
+        return np.array([_filled_volume(self.mol[b], self.phase[b], self.present[b], self.molar_mass[b], self.density[b])
+            for b in range(self.n)])
+
+    def heat_capacity(self):
+        """
+        Returns:
+            np.ndarray: The heat capacity of each vessel (in J/K)
+        """
+        return np.array([_heat_capacity(self.volume[b], self.mol[b], self.present[b], self.molar_mass[b], self.specific_heat[b])
+            for b in range(self.n)])
+
+    def get_layers(self):
+        """
+        Returns:
+            np.ndarray: The color of each vessel layer, shape [N, 100]
+        """
+        return self._layers
+
+    def _target_args(self, other):
+        if other.species != self.species or other.n != self.n:
+            raise ValueError(f"Cannot transfer between {self} and {other} since they have different columns")
+        return (other.mol, other.phase, other.present, other.dissolved, other.volume,
+            other._layers_position, other._layers_variance, other._layer_volumes, other._properties(),
+            other._default_properties)
+
+    def pour_by_percent(self, fraction, other_vessel: "BatchedVessel"):
+        """
+        Pours a fraction of all contents in each vessel into the matching vessel of other_vessel.
+
+        Returns:
+            np.ndarray: A status code for each vessel (-1 if the target overflowed)
+        """
+        return _pour_by_percent(_as_array(fraction, self.n), self.mol, self.phase, self.present, self.dissolved,
+            *self._target_args(other_vessel), self.sol_cols, self.is_solute)
+
+    def pour_by_volume(self, volume, other_vessel: "BatchedVessel"):
+        """
+        Pours a volume (in litres) from each vessel into the matching vessel of other_vessel.
+
+        Returns:
+            np.ndarray: A status code for each vessel (-1 if the target overflowed)
+        """
+        fraction = _volume_fractions(_as_array(volume, self.n), self.mol, self.phase, self.present,
+            self.molar_mass, self.density)
+        return self.pour_by_percent(fraction, other_vessel)
+
+    def drain_by_pixel(self, n_pixel, other_vessel: "BatchedVessel"):
+        """
+        Drains the bottom n_pixel layers of each vessel into the matching vessel of other_vessel.
+
+        Returns:
+            np.ndarray: A status code for each vessel (-1 if the target overflowed, -2 if layers are ignored)
+        """
+        if self.ignore_layout: return np.full(self.n, -2)
+        return _drain_by_pixel(_as_array(n_pixel, self.n, np.int64), self._hashed_layers, self._layers_volume,
+            self.mol, self.phase, self.present, self.dissolved, *self._target_args(other_vessel),
+            self.sol_cols, self.is_solute)
+
+    def heat_contact(self, Tf, ht, other_vessel: "BatchedVessel"):
+        """
+        Puts each vessel in contact with a heat reservoir, boiled materials go into other_vessel.
+
+        Args:
+            Tf (np.ndarray): The temperature of each heat source (NaN to use ht as heat instead)
+            ht (np.ndarray): The heat transfer coefficient multiplied by time for each vessel
+
+        Returns:
+            np.ndarray: A status code for each vessel (-1 if an illegal state was reached)
+        """
+        return _heat_contact(_as_array(Tf, self.n), _as_array(ht, self.n), self.temperature, self.volume,
+            self.mol, self.phase, self.present, self.dissolved, *self._target_args(other_vessel),
+            self.sol_cols, self.is_solute, self._properties())
+
+    def change_heat(self, dQ, other_vessel: "BatchedVessel"):
+        """Adds heat dQ to each vessel (see heat_contact)."""
+        return self.heat_contact(np.nan, dQ, other_vessel)
+
+    def mix(self, t, mask=None):
+        """
+        Shakes each vessel (t<0) or lets it settle (t>0)
+
+        Args:
+            t (np.ndarray): The mixing time for each vessel
+            mask (Optional[np.ndarray]): Which vessels to mix (defaults to all of them)
+
+        Returns:
+            np.ndarray: A status code for each vessel (-2 if layers are ignored)
+        """
+        if self.ignore_layout: return np.full(self.n, -2)
+        mask = np.ones(self.n, dtype=np.bool_) if mask is None else _as_array(mask, self.n, np.bool_)
+        _mix(_as_array(t, self.n, np.float32), mask, self.volume, self.mol, self.phase, self.present, self.dissolved,
+            self._layers_position, self._layers_variance, self._layer_volumes, self._layers_volume, self._lvar,
+            self._variance, self.sol_cols, self.is_solute, self.is_solvent, self.molar_mass, self.density,
+            self.color, self.polarity)
+        return np.zeros(self.n, dtype=np.int64)
+
+    def update_layers(self, mask=None):
+        """
+        Updates the layer image of each vessel
+
+        Args:
+            mask (Optional[np.ndarray]): Which vessels to update (defaults to all of them)
+        """
+        if self.ignore_layout: return np.full(self.n, -2)
+        mask = np.ones(self.n, dtype=np.bool_) if mask is None else _as_array(mask, self.n, np.bool_)
+        _update_layers(mask, self.mol, self.present, self._layers_volume, self._layers_position, self._lvar,
+            self._layers, self._hashed_layers, self.sol_cols, self.is_solute, self.is_solvent, self.color,
+            layer_values)
+        return np.zeros(self.n, dtype=np.int64)
+
+    def push_event_to_queue(
+            self,
+            events: Tuple[Event] = tuple(),
+            dt: float = 0,
+            update_layers: bool = True,
+        ) -> np.ndarray:
+        """
+        The batched version of :meth:`Vessel.push_event_to_queue`, event parameters can either be
+        scalars or hold one value per vessel.
+
+        Args:
+            events (Tuple[Event]): The sequence of events to be executed.
+            dt (float): The amount of time elapsed (defaults to 0).
+            update_layers (bool): Whether or not to update layer information at the end of the queue.
+
+        Returns:
+            np.ndarray: A [event, vessel] array of status codes.
+        """
+        event_dict = type(self)._event_dict
+        status = np.zeros([len(events), self.n], dtype=np.int64)
+        for i,event in enumerate(events):
+            args = (event.other_vessel,) if event.other_vessel is not None else ()
+            status[i] = event_dict[event.name](self, *event.parameter, *args)
+        if (not self.ignore_layout) and update_layers:
+            self.mix(dt)
+            self.update_layers()
+        return status
+
+    _event_dict = {
+            'pour by volume': pour_by_volume,
+            'pour by percent':pour_by_percent,
+            'drain by pixel': drain_by_pixel,
+            'mix': mix,
+            'update layer': update_layers,
+            'change heat': change_heat,
+            'heat contact': heat_contact,
+        }
@@ -16,12 +16,13 @@ from chemistrylab.reactions.reaction_info import ReactInfo, REACTION_PATH
 import importlib
 from chemistrylab.lab.shelf import VariableShelf
 
-def wurtz_vessel(add_mat):
+def wurtz_vessel(add_mat, rng=np.random):
     """
     Function to generate an input vessel for the wurtz distillation experiment.
 
     Args:
         add_mat (str): The target material to include in the vessel
+        rng (np.random.Generator): Random number generator to use (defaults to the global numpy RNG)
 
     Returns:
         Vessel: A vessel containing add_mat and some undesired materials
@@ -66,7 +67,7 @@ def wurtz_vessel(add_mat):
         add_material.get_name(): add_material
     }
 
-    if np.random.choice([0, 1]) > 0.5:
+    if rng.choice([0, 1]) > 0.5:
         add_material2 = material.Dodecane() if (add_mat == 'NaCl') else material.NaCl()
         add_material2.mol=1
         material_dict[add_material2.get_name()] = add_material2
@@ -97,7 +98,7 @@ class GeneralWurtzDistill_v2(GenBench):
     def __init__(self):
         d_rew= RewardGenerator(use_purity=True,exclude_solvents=False,include_dissolved=True)
         shelf = VariableShelf( [
-            lambda x:wurtz_vessel(x)[0],
+            lambda x, rng=np.random:wurtz_vessel(x, rng)[0],
             lambda x:vessel.Vessel("Beaker 1"),
             lambda x:vessel.Vessel("Beaker 2"),
         ],[], n_working = 3)
@@ -162,7 +163,7 @@ class WurtzDistillDemo_v0(GenBench):
     def __init__(self):
         d_rew= RewardGenerator(use_purity=True,exclude_solvents=False,include_dissolved=True)
         shelf = VariableShelf( [
-            lambda x:wurtz_vessel(x)[0],
+            lambda x, rng=np.random:wurtz_vessel(x, rng)[0],
             lambda x:vessel.Vessel("Beaker 1"),
             lambda x:vessel.Vessel("Beaker 2"),
         ],[], n_working = 3)
@@ -162,7 +162,7 @@ class GeneralWurtzExtract_v2(GenBench):
             lambda x:vessel.Vessel("Beaker 2"),
             lambda x:make_solvent("C6H14"),
             lambda x:make_solvent("diethyl ether")
-        ],[], n_working = 3)
+        ],[], n_working = 3, cache_templates = True)
         amounts=np.linspace(0.2,1,5).reshape([5,1])
         pixels = (amounts*10).astype(np.int32)
         actions = [
@@ -206,7 +206,7 @@ class WaterOilExtract_v0(GenBench):
             lambda x:vessel.Vessel("Waste Vessel"),
             lambda x:make_solvent("C6H14"),
             lambda x:make_solvent("H2O")
-        ], [], n_working = 2)
+        ], [], n_working = 2, cache_templates = True)
         amounts=np.linspace(0.2,1,5).reshape([5,1])
         pixels = (amounts*10).astype(np.int32)
         actions = [
@@ -253,7 +253,7 @@ class WurtzExtractDemo_v0(GenBench):
             lambda x:vessel.Vessel("Beaker 2"),
             lambda x:make_solvent("C6H14"),
             lambda x:make_solvent("diethyl ether")
-        ],[], n_working = 3)
+        ],[], n_working = 3, cache_templates = True)
         amounts=np.ones([1,1])*0.02
         pixels = [[1]]
         actions = [
@@ -306,7 +306,7 @@ class SeparateTest_v0(GenBench):
             lambda x:make_solvent("H2O"),
             lambda x:make_solvent("ethoxyethane"),
             lambda x:make_solvent("ethyl acetate"),
-        ],[], n_working = 3)
+        ],[], n_working = 3, cache_templates = True)
         amounts=np.ones([1,1])*0.02
         pixels = [[1]]
         actions = [
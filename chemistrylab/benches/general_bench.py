@@ -2,15 +2,18 @@
 from typing import NamedTuple, Tuple, Callable, Optional
 import gymnasium as gym
 import numpy as np
+import copy
 
 #Imports which need to go soon
 import sys
 from chemistrylab import vessel
 from chemistrylab.reactions.reaction import Reaction
+from chemistrylab.reactions.reaction_info import ReactInfo
 from chemistrylab.benches.characterization_bench import CharacterizationBench
 from chemistrylab.util.Visualization import Visualizer
 
 from chemistrylab.lab.shelf import Shelf
+from chemistrylab.benches.reset_pool import ResetPool
 
 Event = vessel.Event
 
@@ -28,6 +31,24 @@ class ContinuousParam(NamedTuple):
     thresh: float
     other: tuple
 
+class BenchState(NamedTuple):
+    """A snapshot of a bench created by :meth:`GenBench.clone_state`"""
+    vessels: Tuple[tuple]
+    layouts: Tuple[tuple]
+    materials: Tuple[tuple]
+    layer_mats: Tuple[tuple]
+    data: np.ndarray
+    steps: int
+    target_material: str
+    initial_reward: float
+
+def _unbound_copy(mat):
+    """Returns a copy of a material which is not bound to any vessel"""
+    mat = copy.copy(mat)
+    if mat._vessel is not None:
+        mat._unbind()
+    return mat
+
 def default_reward(vessels,targ):
     sum_=0
     for vessel in vessels:
@@ -36,6 +57,29 @@ def default_reward(vessels,targ):
         if all_mat>1e-12:
             sum_+=(mats[targ].mol if targ in mats else 0)**2/all_mat
     return sum_
+
+def batched_reaction(events: Tuple[Event]) -> Optional[Reaction]:
+    """
+    Returns:
+        Reaction: The reaction if `events` is just a single react event (so it can be run on many vessels with
+        :meth:`Reaction.update_batch`), otherwise None.
+    """
+    if len(events) == 1 and events[0].name == "react" and events[0].other_vessel is None:
+        return events[0].parameter[0]
+    return None
+
+def push_default_events(events: Tuple[Event], vessels: Tuple[vessel.Vessel], reaction: Optional[Reaction] = None):
+    """
+    Performs a bench's default events on each vessel (without updating layers). If `reaction` is given (see
+    :func:`batched_reaction`) it is performed on all of the vessels at once instead.
+    """
+    if reaction is None:
+        for v in vessels:
+            v.push_event_to_queue(events, update_layers=False)
+    else:
+        for v in vessels:
+            v._version += 1
+        reaction.update_batch(vessels)
     
 class GenBench(gym.Env):
     """A class representing an bench setup for conducting experiments.
@@ -101,9 +145,18 @@ class GenBench(gym.Env):
             self.action_space = gym.spaces.Box(0, 1, (self.n_actions,), dtype=np.float32)
         
         self.disincentive = -0.1
+        self.reset_pool = None
 
         self.reset()
         
+    @property
+    def reaction_info(self) -> ReactInfo:
+        """The ReactInfo of the reaction performed by the default events (empty if there is no reaction)"""
+        for event in self.default_events:
+            if event.name == "react":
+                return event.parameter[0].react_info
+        return ReactInfo("", (), (), (), (), None, None, None, np.zeros([0, 0]))
+
     def get_vessels(self):
         return self.shelf
     def update_vessels(self,new_vessels):
@@ -205,8 +258,7 @@ class GenBench(gym.Env):
             
         #perform any default events
         if self.default_events:
-          for vessel in self.shelf.get_working_vessels():
-            vessel.push_event_to_queue(self.default_events, update_layers=False)
+            push_default_events(self.default_events, self.shelf.get_working_vessels(), batched_reaction(self.default_events))
             
         #Increment the step counter and check if you are done
         self.steps+=1
@@ -221,9 +273,72 @@ class GenBench(gym.Env):
         
         return state, reward, done, False, {}
     
-    def _reset(self,target):
+    def clone_state(self):
+        """
+        Takes a snapshot of the bench which can later be restored with :meth:`restore_state`.
+
+        The contents of every vessel on the shelf (amounts, phases, dissolved amounts, layer information),
+        vessel temperatures and volumes are packed into a single float64 buffer. Materials are kept as unbound
+        copies, so the snapshot holds no references to the vessels and is not changed by later steps.
+
+        Note: The random number generator states are not part of the snapshot.
+
+        Returns:
+            BenchState: The snapshot
+        """
+        vessels = self.shelf.get_vessels()
+        pieces = []
+        for v in vessels:
+            pieces.append(np.array([v.temperature, v.volume, v._variance], dtype=np.float64))
+            pieces += [a.ravel() for a in v._state_views()]
+        return BenchState(
+            tuple((v.label, v.default_dt, v.ignore_layout) for v in vessels),
+            tuple(v._state_layout() for v in vessels),
+            tuple(tuple(_unbound_copy(m) for m in v.material_dict.values()) for v in vessels),
+            tuple(tuple(_unbound_copy(m) for m in v._layer_mats) for v in vessels),
+            np.concatenate(pieces).astype(np.float64),
+            self.steps,
+            self.target_material,
+            self.initial_reward
+        )
+
+    def restore_state(self, state: BenchState):
+        """
+        Puts the bench back into a state given by :meth:`clone_state`. The vessels already on the shelf are
+        reused, and when the structure of a vessel has not changed since the snapshot (the usual case) its
+        arrays are overwritten in place. The snapshot itself is left untouched so it can be restored again.
+
+        Args:
+            state (BenchState): The snapshot to restore
+        """
+        vessels = getattr(self.shelf, "vessels", None)
+        if vessels is None or len(vessels) != len(state.vessels):
+            # Events hold onto the vessels they act on, so new vessels need new actions
+            vessels = self.shelf.vessels = [vessel.Vessel(label) for label,*_ in state.vessels]
+            self.actions = [(self.build_event(a,p),a)  for a in self.action_list for p in a.parameters]
+        data = state.data
+        i = 0
+        for v, (label, dt, ignore_layout), layout, materials, layer_mats in zip(
+                vessels, state.vessels, state.layouts, state.materials, state.layer_mats):
+            if v._state_layout() != layout or not v._same_materials(materials):
+                v._set_layout(layout, [copy.copy(m) for m in materials])
+            v.label, v.default_dt, v.ignore_layout = label, dt, ignore_layout
+            v.temperature, v.volume, v._variance = (float(x) for x in data[i:i+3])
+            i += 3
+            for a in v._state_views():
+                a[...] = data[i:i+a.size].reshape(a.shape)
+                i += a.size
+            mdict = v.material_dict
+            v._layer_mats = [mdict[m._name] if m._name in mdict else copy.copy(m) for m in layer_mats]
+            v._settled = None
+            v._aggregates = None
+        self.steps = state.steps
+        self.target_material = state.target_material
+        self.initial_reward = state.initial_reward
+
+    def _reset(self,target,rng=None):
         self.steps=0
-        self.shelf.reset(target)
+        self.shelf.reset(target,rng)
         self.target_material=target
         #Rebuild the list of actions with the new vessels
         self.actions = [(self.build_event(a,p),a)  for a in self.action_list for p in a.parameters]
@@ -234,10 +349,36 @@ class GenBench(gym.Env):
     
     def reset(self, *args, seed=None, options=None):
 
+        if self.reset_pool is not None:
+            if seed is not None:
+                self.reset_pool.restart(seed)
+                self.action_space.seed(seed)
+            state, obs = self.reset_pool.pop()
+            self.restore_state(state)
+            return obs.copy(),{}
+
         np.random.seed(seed)
         self.action_space.seed(seed)
         target=np.random.choice(self.targets)
         return self._reset(target),{}
+
+    def use_reset_pool(self, size=8, seed=None, background=True):
+        """
+        Makes :meth:`reset` take pre-generated initial states from a :class:`~chemistrylab.benches.reset_pool.ResetPool`
+        instead of building them on the spot. Passing a seed to reset restarts the pool with that seed.
+
+        Args:
+            size (int): Number of initial states to keep ready (0 turns the pool off)
+            seed (int): Seed for the sequence of initial states
+            background (bool): Whether the pool is refilled by a worker thread or by reset itself when it runs empty
+        """
+        if self.reset_pool is not None:
+            self.reset_pool.close()
+        self.reset_pool = ResetPool(self, size, seed, background) if size > 0 else None
+
+    def close(self):
+        if self.reset_pool is not None:
+            self.reset_pool.close()
         
     def render(self):
         return self.visual.get_rgb(self.shelf.get_working_vessels())
\ No newline at end of file
@@ -0,0 +1,123 @@
+'''
+Pre-generated initial states for benches
+
+:title: reset_pool.py
+
+Builds initial bench states ahead of time so resetting a bench is just a matter of restoring one
+(see :meth:`chemistrylab.benches.general_bench.GenBench.use_reset_pool`).
+'''
+import copy
+import queue
+import threading
+import numpy as np
+import numba
+from numba import _helperlib
+
+@numba.jit(nopython=True)
+def _seed_numba(seed):
+    # numba has its own (per thread) random state which is used by the layer separation code
+    np.random.seed(seed)
+
+
+class ResetPool:
+    """
+    A bounded queue of initial states (and observations) for a bench.
+
+    States are generated on a private copy of the bench with its own random number generator, so neither the
+    bench nor the global numpy (or numba) random state is touched. The i-th
+    state is generated from a seed derived from (seed, i), so the sequence of states is reproducible no matter
+    when (or on which thread) they are generated.
+
+    Args:
+        bench (GenBench): The bench to generate initial states for
+        size (int): Maximum number of states kept ready
+        seed (int): Seed for the sequence of states (a random seed is used if None)
+        background (bool): If True a worker thread keeps the pool full, otherwise the pool is refilled
+            (all at once) by the thread calling :meth:`pop` whenever it runs empty.
+    """
+    def __init__(self, bench, size=8, seed=None, background=True):
+        if size < 1:
+            raise ValueError("The reset pool needs room for at least one state")
+        self.size = size
+        self.background = background
+        # A copy of the bench which only shares the read-only parts (actions, reward function, etc.)
+        self._worker = copy.copy(bench)
+        self._worker.reset_pool = None
+        self._worker.shelf = copy.deepcopy(bench.shelf)
+        if hasattr(self._worker.shelf, "_templates"):
+            # Templates are rebuilt from the pool's seeds so the states do not depend on the bench's history
+            self._worker.shelf._templates = dict()
+        self._worker.characterization_bench = copy.deepcopy(bench.characterization_bench)
+        self._thread = None
+        self.restart(seed)
+
+    def _state_seed(self, index):
+        return int(np.random.SeedSequence([self.seed, index]).generate_state(1)[0])
+
+    def _generate(self, index):
+        """
+        Returns:
+            Tuple[BenchState, np.ndarray]: The index-th initial state and its observation
+        """
+        worker = self._worker
+        seed = self._state_seed(index)
+        # The worker has its own generator, which is passed on to vessel functions taking an rng keyword
+        # (see VariableShelf.reset), so the global numpy RNG is left alone
+        rng = np.random.default_rng(seed)
+        # When states are made on the thread calling pop its numba random state is put back afterwards
+        state_ptr = _helperlib.rnd_get_np_state_ptr()
+        numba_state = _helperlib.rnd_get_state(state_ptr)
+        _seed_numba(seed)
+        try:
+            target = rng.choice(worker.targets)
+            obs = worker._reset(target, rng)
+        finally:
+            _helperlib.rnd_set_state(state_ptr, numba_state)
+        return worker.clone_state(), obs
+
+    def _fill(self):
+        """Worker thread loop, generates states until stopped."""
+        stop, index = self._stop, 0
+        while not stop.is_set():
+            item = self._generate(index)
+            index += 1
+            while not stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def restart(self, seed=None):
+        """
+        Throws away the pending states and starts a new sequence of states.
+
+        Args:
+            seed (int): Seed for the new sequence (a random seed is used if None)
+        """
+        self.close()
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self._queue = queue.Queue(self.size)
+        self._next = 0
+        self._stop = threading.Event()
+        if self.background:
+            self._thread = threading.Thread(target=self._fill, daemon=True)
+            self._thread.start()
+
+    def pop(self):
+        """
+        Returns:
+            Tuple[BenchState, np.ndarray]: The next initial state and its observation
+        """
+        if not self.background and self._queue.empty():
+            for _ in range(self.size):
+                self._queue.put(self._generate(self._next))
+                self._next += 1
+        return self._queue.get()
+
+    def close(self):
+        """Stops the worker thread (if there is one)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,168 @@
+'''
+Vectorized version of GenBench
+
+:title: vector_bench.py
+
+A thin wrapper which runs several copies of a bench inside one process. Actions are still performed
+one environment at a time, only the per-environment bookkeeping (step counters, targets, initial rewards,
+observations) lives in numpy arrays and the default reaction is integrated for every environment in one call.
+'''
+from typing import Callable, Optional, Union
+import gymnasium as gym
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+from chemistrylab.benches.general_bench import GenBench, batched_reaction, push_default_events
+
+
+class GenBenchVector(gym.vector.VectorEnv):
+    """A vector environment which steps ``num_envs`` copies of a :class:`GenBench`.
+
+    This is a thin wrapper in the spirit of ``SyncVectorEnv`` (or stable-baselines' ``DummyVecEnv``): each
+    action is performed by its own bench in a python loop, so vessel events are not batched (see
+    :class:`~chemistrylab.batched_vessel.BatchedVessel` for that). What it saves over ``SyncVectorEnv`` is the
+    per-step overhead around the benches. They are not wrapped, so no wrapper or checker code runs on a step.
+    Step counters, targets and rewards live in arrays, and observations are written straight into a
+    preallocated buffer. Terminal rewards are only computed for environments which finished, and if every bench
+    performs the same reaction it is integrated for all of their vessels in one call. Finished environments are
+    reset automatically, with the last observation kept in ``info["final_observation"]`` as in gymnasium's own
+    vector environments.
+
+    Args:
+        env_fn (Callable or str): Constructor (or ``"module:Class"`` entry point) of the bench
+        num_envs (int): Number of benches to run
+        max_episode_steps (int): Optional episode length after which environments are truncated
+        env_kwargs (dict): Keyword arguments passed to ``env_fn``
+    """
+    def __init__(
+        self,
+        env_fn: Union[Callable, str],
+        num_envs: int = 1,
+        max_episode_steps: Optional[int] = None,
+        env_kwargs: Optional[dict] = None,
+    ):
+        if isinstance(env_fn, str):
+            env_fn = load_env_creator(env_fn)
+        env_kwargs = {} if env_kwargs is None else env_kwargs
+        self.envs = [env_fn(**env_kwargs) for _ in range(num_envs)]
+        for env in self.envs:
+            if not isinstance(env, GenBench):
+                raise TypeError(f"GenBenchVector expects GenBench environments, got {type(env).__name__}")
+
+        env = self.envs[0]
+        super().__init__(num_envs, env.observation_space, env.action_space)
+        self.discrete = env.discrete
+        self.max_episode_steps = max_episode_steps
+        # If every bench performs the same reaction it is integrated for all of their vessels in one call
+        reactions = [batched_reaction(e.default_events) for e in self.envs]
+        if reactions[0] is not None and all(reactions[0].batchable_with(r) for r in reactions):
+            self._reaction = reactions[0]
+        else:
+            self._reaction = None
+
+        # Per-environment state
+        self.targets = list(env.targets)
+        self.max_steps = np.array([e.max_steps for e in self.envs], dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.target_index = np.zeros(num_envs, dtype=np.int64)
+        self.initial_reward = np.zeros(num_envs, dtype=np.float64)
+
+        # Output buffers
+        self._observations = np.zeros(self.observation_space.shape, dtype=self.single_observation_space.dtype)
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminated = np.zeros(num_envs, dtype=np.bool_)
+        self._truncated = np.zeros(num_envs, dtype=np.bool_)
+        self._actions = None
+
+    def _record_reset(self, i):
+        """Copies the bookkeeping of a freshly reset sub-environment into the state arrays."""
+        env = self.envs[i]
+        self.steps[i] = 0
+        self.target_index[i] = self.targets.index(env.target_material)
+        self.initial_reward[i] = env.initial_reward
+
+    def _reset_env(self, i, seed=None, options=None):
+        obs, info = self.envs[i].reset(seed=seed, options=options)
+        self._record_reset(i)
+        self._observations[i] = obs
+        return info
+
+    def reset_wait(self, seed: Optional[Union[int, list]] = None, options: Optional[dict] = None):
+        """Resets every sub-environment.
+
+        Args:
+            seed (int or list): A single seed (environment i gets ``seed+i``) or one seed per environment
+            options (dict): Passed on to each sub-environment's reset
+
+        Returns:
+            Tuple[np.ndarray, dict]: The stacked observations and (empty) info
+        """
+        if seed is None or isinstance(seed, int):
+            seed = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} seeds, got {len(seed)}")
+        for i, s in enumerate(seed):
+            self._reset_env(i, s, options)
+        return self._observations.copy(), {}
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        """Performs the stored actions on every sub-environment (one at a time), then runs the default events.
+
+        Returns:
+            Tuple: stacked observations, rewards, terminations, truncations and info
+        """
+        actions = self._actions
+        rewards, terminated, truncated = self._rewards, self._terminated, self._truncated
+
+        for i, env in enumerate(self.envs):
+            if self.discrete:
+                terminated[i], rewards[i] = env._perform_discrete_action(actions[i])
+            else:
+                terminated[i], rewards[i] = env._perform_continuous_action(actions[i])
+            if env.default_events and self._reaction is None:
+                push_default_events(env.default_events, env.shelf.get_working_vessels())
+        if self._reaction is not None:
+            vessels = [v for env in self.envs for v in env.shelf.get_working_vessels()]
+            push_default_events(self.envs[0].default_events, vessels, self._reaction)
+
+        self.steps += 1
+        terminated |= self.steps >= self.max_steps
+        if self.max_episode_steps is None:
+            truncated[:] = False
+        else:
+            truncated[:] = (self.steps >= self.max_episode_steps) & ~terminated
+
+        infos = {}
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            final_obs = np.full(self.num_envs, None, dtype=object)
+            final_mask = np.zeros(self.num_envs, dtype=np.bool_)
+        for i, env in enumerate(self.envs):
+            vessels = env.shelf.get_working_vessels()
+            target = self.targets[self.target_index[i]]
+            if terminated[i]:
+                rewards[i] += env.reward_function(vessels, target) - self.initial_reward[i]
+            self._observations[i] = env.characterization_bench(vessels, target)
+
+        # Autoreset finished environments
+        for i in done:
+            final_obs[i] = self._observations[i].copy()
+            final_mask[i] = True
+            self._reset_env(i)
+        if len(done):
+            infos["final_observation"] = final_obs
+            infos["_final_observation"] = final_mask
+            infos["final_info"] = np.array([{} if m else None for m in final_mask], dtype=object)
+            infos["_final_info"] = final_mask.copy()
+
+        return self._observations.copy(), rewards.copy(), terminated.copy(), truncated.copy(), infos
+
+    def render(self):
+        return [env.render() for env in self.envs]
+
+    def close_extras(self, **kwargs):
+        self.envs = []
+
@@ -17,7 +17,7 @@ x = np.linspace(0, 1, 100, endpoint=True, dtype=np.float32)
 #from numba.pycc import CC
 #cc = CC('separate_cc')
 
-@numba.jit(cache=True,nopython=True)
+@numba.jit(cache=True,nopython=True,nogil=True)
 #@cc.export('map_to_state', '(f4[:], f4[:],f4[:],f4[:],f4[:])')
 def map_to_state(A, B, C, colors, x=x):
     """
@@ -172,7 +172,7 @@ def map_to_state(A, B, C, colors, x=x):
     return L,L2
 
 
-@numba.jit(cache=True,nopython=True)
+@numba.jit(cache=True,nopython=True,nogil=True)
 #@cc.export('mix', '(f4[:], f4[:], f4[:], f4[:], f4[:], f4, f4[:], f4[:], f4[:], f4[:,:],f4)')
 def mix(v, Vprev, v_solute, B, C, C0 , D, Spol, Lpol, S, mixing):
     """
@@ -408,6 +408,32 @@ def mix(v, Vprev, v_solute, B, C, C0 , D, Spol, Lpol, S, mixing):
     return B, v_layer, C,C0, S, var_layer
 
 
+@numba.jit(cache=True,nopython=True)
+def advance_solute_time(C0, mixing):
+    """
+    Gives the solute variance mix would return when none of the volumes change and no solutes move,
+    ie. when the only thing changing is the time-like variable of the solutes.
+    (This mirrors the [Mixing / Separating Solutes] section of mix, so the two give identical results)
+
+    Args:
+        C0 (float): The current variance of solutes in the vessel
+        mixing (float): The time value assigned to a fully mixed solution
+
+    Returns:
+        float: The new variance of solutes in the vessel
+    """
+    tmix = np.float32(-1.6120857137646178)
+    tseparate = np.float32(-1.47)
+    t = np.float32(-np.log(C0 * np.sqrt(2.0 * np.pi)) )
+    # No volumes change, so the solvents add no extra solute mixing
+    if mixing<0:
+        t=min(t,tseparate)
+    if t + mixing < tmix:
+        mixing = tmix - t
+    t += mixing
+    return np.float32( np.exp(-1.0 * t) / np.sqrt(2.0 * np.pi) )
+
+
 
 
 
@@ -2,6 +2,7 @@
 
 """
 import sys
+import inspect
 import numpy as np
 from chemistrylab import material
 from chemistrylab.vessel import Vessel
@@ -51,40 +52,80 @@ class Shelf:
         """
         pass
 
-    def reset(self, target = None):
+    def reset(self, target = None, rng = None):
         """
         TODO: Update this along with __init__
         Resets the shelf to it's initial state
         """
-        self.vessels=[deepcopy(v) for v in self._orig_vessels]
+        self.vessels=self._from_templates(self._orig_vessels)
+
+    def _from_templates(self, templates):
+        """
+        Returns a list of vessels matching `templates`. If the shelf already holds one vessel per template,
+        those vessels are overwritten in place (see Vessel._load_template), otherwise the templates are deepcopied.
+        """
+        vessels = getattr(self, "vessels", None)
+        if vessels is None or len(vessels) != len(templates) or any(v is t for v,t in zip(vessels, templates)):
+            return [deepcopy(v) for v in templates]
+        for v,t in zip(vessels, templates):
+            v._load_template(t)
+        return vessels
+
 
 
+def _call_vessel_func(vessel_func, target, rng):
+    """Calls a vessel function, passing rng on to functions which take an rng keyword"""
+    if rng is not None and "rng" in inspect.signature(vessel_func).parameters:
+        return vessel_func(target, rng=rng)
+    return vessel_func(target)
+
 
 class VariableShelf(Shelf):
     """
     Shelf which is given a set of fixed and variable vessels. 
     On reset the original vessels are deepcopied into new vessel objects
+
+    If cache_templates is set, the variable vessels made for each target are kept as templates the first
+    time the target is seen, and later resets copy these templates instead of calling the vessel functions
+    again. Only use this when the vessel functions always give the same vessels for a given target.
+
+    Vessel functions which draw random numbers should take an `rng` keyword (see distillation_bench.wurtz_vessel),
+    so a generator passed to reset is used instead of the global numpy RNG.
     
     """
-    def __init__(self, variable_vessels: list, fixed_vessels: list, n_working = 1):
+    def __init__(self, variable_vessels: list, fixed_vessels: list, n_working = 1, cache_templates = False):
         """
         TODO: Allow the starting vessels to be given as arguments.
         """
         self.n_working = n_working
         self.variable_vessels = variable_vessels
         self.fixed_vessels = fixed_vessels
+        self.cache_templates = cache_templates
+        self._templates = dict()
 
         self._length = len(variable_vessels)+len(fixed_vessels)
         assert n_working<=self._length
 
         self.reset()
 
-    def reset(self, target = None):
+    def reset(self, target = None, rng = None):
+
+        if self.cache_templates:
+            templates = self._templates.get(target)
+            if templates is None:
+                templates = [_call_vessel_func(vessel_func, target, rng) for vessel_func in self.variable_vessels] + list(self.fixed_vessels)
+                # Working vessels are observed after every reset, so their layers are worked out once here
+                for v in templates[:self.n_working]:
+                    if not v.ignore_layout:
+                        v.get_layers()
+                self._templates[target] = templates
+            self.vessels = self._from_templates(templates)
+            return
 
         variable = []
         if len(self.variable_vessels)>0:
             # Set the target to the first one in the dict if not provided
-            variable = [vessel_func(target) for vessel_func in self.variable_vessels]
+            variable = [_call_vessel_func(vessel_func, target, rng) for vessel_func in self.variable_vessels]
         
         self.vessels = variable + [deepcopy(v) for v in self.fixed_vessels]
 
@@ -26,24 +26,330 @@ Property : Intended Units -- Object Type -- Brief Description
     - litres: volume in litres
     - vapour_enthalpy: heat to vaporize in J
 
-Moreover, the `REGISTRY` variable gives a dictionary of available materials.
+Moreover, the `REGISTRY` variable gives a dictionary of available materials, and `SPECIES_INDEX` gives
+each material name a process-wide integer id (used by vessels to store their contents in arrays).
+
+The properties of the pre-defined materials are kept in a table (materials.csv, see :class:`MaterialTable`)
+which is only read the first time it is needed. More materials can be added from csv files with the same
+columns using `MATERIAL_TABLE.add(path)`, these get a Material class the first time they are looked up in
+the `REGISTRY`.
 '''
 
+import csv
 import inspect
+import os
 import numpy as np
 import math
 import sys
-from chemistrylab.util import diff_spectra as spec
+from collections.abc import MutableMapping
+from typing import NamedTuple, Optional, Tuple
+
+# Integer codes for each phase (the empty string is used for materials without a phase)
+PHASES = ("s", "l", "g", "")
+PHASE_INDEX = {p:i for i,p in enumerate(PHASES)}
+
+class SpeciesRecord(NamedTuple):
+    """
+    The properties shared by every Material of the same species. Materials only hold a reference to
+    their record, and setting one of these properties on a Material gives it its own modified copy.
+    """
+    name: str
+    molar_mass: float
+    density: tuple # indexed by phase code (None for phases the material can't be in)
+    color: float
+    boiling_point: float
+    melting_point: float
+    specific_heat: Optional[float]
+    enthalpy_fusion: float
+    enthalpy_vapor: float
+    spectra_overlap: np.ndarray
+    spectra_no_overlap: np.ndarray
+    index: Optional[int]
+
+    def __deepcopy__(self, memo):
+        # Records are never changed in place so copies can share them
+        return self
+
+class MaterialTable:
+    """
+    Per-species material properties read from csv files with one row per material (see materials.csv).
+    The files are read the first time the table is used, and each property is kept in a numpy array
+    indexed by species id (see :func:`get_species_id`). Empty cells are unknown (None) properties.
+
+    Args:
+        paths (List[str]): The csv files to read, rows of later files replace rows of earlier ones
+    """
+    # Column (or array) names along with their dtype and the value used for unknown properties
+    COLUMNS = dict(
+        polarity=(np.float64, np.nan), temperature=(np.float64, np.nan), pressure=(np.float64, np.nan),
+        charge=(np.float64, np.nan), molar_mass=(np.float64, np.nan), color=(np.float64, np.nan),
+        boiling_point=(np.float64, np.nan), melting_point=(np.float64, np.nan), specific_heat=(np.float64, np.nan),
+        enthalpy_fusion=(np.float64, np.nan), enthalpy_vapor=(np.float64, np.nan),
+        phase=(np.int8, PHASE_INDEX[""]), solute=(np.bool_, False), solvent=(np.bool_, False),
+        spectra_overlap=(object, ""), spectra_no_overlap=(object, ""), index=(np.int64, -1),
+    )
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._rows = None
+        self._species = dict()
+
+    def add(self, path):
+        """Adds the materials in a csv file to the table."""
+        self.paths.append(path)
+        if self._rows is not None:
+            self._read(path)
+
+    def _load(self):
+        """Reads the table (if it has not been read yet) and returns the (name, species id) pairs of its rows"""
+        if self._rows is None:
+            self._rows = dict()
+            self.density = np.zeros([0, len(PHASES)])
+            for key, (dtype, fill) in self.COLUMNS.items():
+                setattr(self, key, np.zeros(0, dtype=dtype))
+            for path in self.paths:
+                self._read(path)
+        return self._rows
+
+    def _grow(self, n):
+        """Makes sure the property arrays have room for n species ids"""
+        if len(self.density) >= n:
+            return
+        extra = n-len(self.density)
+        self.density = np.concatenate([self.density, np.full([extra, len(PHASES)], np.nan)])
+        for key, (dtype, fill) in self.COLUMNS.items():
+            setattr(self, key, np.concatenate([getattr(self, key), np.full(extra, fill, dtype=dtype)]))
+
+    def _read(self, path):
+        self._species.clear()
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        if len(rows) == 0:
+            return
+        ids = np.array([get_species_id(row["name"]) for row in rows], dtype=np.int64)
+        self._grow(ids.max()+1)
+        def column(key, fill=np.nan):
+            return np.array([float(row[key]) if row[key] else fill for row in rows])
+        self.density[ids, :-1] = np.stack([column("density_"+p) for p in PHASES[:-1]], axis=1)
+        for key, (dtype, fill) in self.COLUMNS.items():
+            if dtype == np.float64:
+                getattr(self, key)[ids] = column(key)
+        self.phase[ids] = [PHASE_INDEX[row["phase"]] for row in rows]
+        self.solute[ids] = [row["solute"] == "1" for row in rows]
+        self.solvent[ids] = [row["solvent"] == "1" for row in rows]
+        self.spectra_overlap[ids] = [row["spectra_overlap"] for row in rows]
+        self.spectra_no_overlap[ids] = [row["spectra_no_overlap"] for row in rows]
+        self.index[ids] = column("index", -1)
+        self._rows.update((row["name"], sid) for row, sid in zip(rows, ids))
+
+    def __contains__(self, name):
+        return name in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def properties(self, name):
+        """
+        Args:
+            name (str): The name of a material in the table
+        Returns:
+            dict: The keyword arguments of Material.__init__ for the material (without mol)
+        """
+        i = self._load()[name]
+        def value(x):
+            return None if np.isnan(x) else float(x)
+        props = {key: value(getattr(self, key)[i]) for key, (dtype, fill) in self.COLUMNS.items() if dtype == np.float64}
+        props.update(
+            name=name,
+            density={p: value(self.density[i, k]) for k,p in enumerate(PHASES[:-1])},
+            phase=PHASES[self.phase[i]],
+            solute=bool(self.solute[i]),
+            solvent=bool(self.solvent[i]),
+            spectra_overlap=_spectra(self.spectra_overlap[i]),
+            spectra_no_overlap=_spectra(self.spectra_no_overlap[i]),
+            index=None if self.index[i] < 0 else int(self.index[i]),
+        )
+        return props
+
+    def species(self, name):
+        """
+        Args:
+            name (str): The name of a material in the table
+        Returns:
+            Tuple[SpeciesRecord, dict]: The (shared) record of the material and the keyword arguments
+            for the rest of its properties (see Material._init_state)
+        """
+        cached = self._species.get(name)
+        if cached is None:
+            props = self.properties(name)
+            for key in ("spectra_overlap", "spectra_no_overlap"):
+                if props[key] is None:
+                    props[key] = np.zeros([0,3])
+            props["density"] = _density_tuple(props["density"])
+            record = SpeciesRecord(**{key: props.pop(key) for key in SpeciesRecord._fields})
+            cached = self._species[name] = (record, props)
+        return cached
+
+    def material_class(self, name):
+        """
+        Args:
+            name (str): The name of a material in the table
+        Returns:
+            type: A new TableMaterial subclass for the material
+        """
+        if name not in self:
+            raise KeyError(name)
+        return type(name, (TableMaterial,), dict(_name=name, __slots__=(), __module__=__name__))
+
+def _density_tuple(density):
+    """Turns a (phase, density) dict into a tuple indexed by phase code"""
+    return tuple(density.get(p) for p in PHASES)
+
+def _spectra(ref):
+    """Looks up a spectra array in chemistrylab.util.diff_spectra by name (None if there is no name)"""
+    if not ref:
+        return None
+    from chemistrylab.util import diff_spectra
+    return getattr(diff_spectra, ref)
+
+class Stoichiometry(NamedTuple):
+    """A set of materials along with how many mol of each take part (ex. what a mol of NaCl dissolves into)"""
+    names: Tuple[str]
+    species: np.ndarray # species ids (int)
+    coefficients: np.ndarray # mol of each material (float)
+
+def _stoichiometry(items):
+    """
+    Builds a Stoichiometry out of a Material, a (Material, coefficient) dict or a (nested) list of these,
+    which covers everything returned by Material.dissolve and Material.precipitate
+    """
+    coefficients = dict()
+    def add(item):
+        if isinstance(item, Material):
+            coefficients[item._name] = coefficients.get(item._name, 0) + 1
+        elif isinstance(item, dict):
+            for mat, coef in item.items():
+                coefficients[mat._name] = coefficients.get(mat._name, 0) + coef
+        else:
+            for x in item:
+                add(x)
+    add(items)
+    names = tuple(coefficients)
+    return Stoichiometry(names, np.array([get_species_id(key) for key in names], dtype=np.int64),
+        np.array([coefficients[key] for key in names], dtype=np.float64))
+
+class MaterialRegistry(MutableMapping):
+    """
+    The available materials as (name, Material class) pairs. Registered classes come first, any other
+    material in the table is given a TableMaterial class the first time it is looked up.
+
+    The registry also keeps how each material dissolves and precipitates (see :meth:`dissolution` and
+    :meth:`precipitation`), so these are only worked out once per material.
+
+    Args:
+        table (MaterialTable): The table to make classes from
+    """
+    def __init__(self, table):
+        self.table = table
+        self._classes = dict()
+        self._dissolution = dict()
+        self._precipitation = dict()
+
+    def dissolution(self, key):
+        """
+        Args:
+            key (str): The name of a material
+        Returns:
+            Stoichiometry: What one mol of the material dissolves into (see Material.dissolve)
+        """
+        result = self._dissolution.get(key)
+        if result is None:
+            result = self._dissolution[key] = _stoichiometry(self[key]().dissolve())
+        return result
+
+    def precipitation(self, key):
+        """
+        Args:
+            key (str): The name of a material
+        Returns:
+            Tuple[Tuple[Stoichiometry, Stoichiometry]]: The (requirements, results) of each precipitation
+            rule of the material (see Material.precipitate)
+        """
+        result = self._precipitation.get(key)
+        if result is None:
+            result = self._precipitation[key] = tuple((_stoichiometry(requirements), _stoichiometry(results))
+                for requirements, results in self[key]().precipitate())
+        return result
+
+    def __getitem__(self, key):
+        cls = self._classes.get(key)
+        if cls is None:
+            cls = self._classes[key] = self.table.material_class(key)
+        return cls
+
+    def __setitem__(self, key, cls):
+        self._classes[key] = cls
+        self._dissolution.pop(key, None)
+        self._precipitation.pop(key, None)
+
+    def __delitem__(self, key):
+        del self._classes[key]
+        self._dissolution.pop(key, None)
+        self._precipitation.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._classes or key in self.table
+
+    def __iter__(self):
+        yield from self._classes
+        yield from (key for key in self.table if key not in self._classes)
+
+    def __len__(self):
+        return len(self._classes) + sum(key not in self._classes for key in self.table)
+
+MATERIAL_TABLE = MaterialTable([os.path.join(os.path.dirname(__file__), "materials.csv")])
+REGISTRY = MaterialRegistry(MATERIAL_TABLE)
+# Process-wide (name, id) pairs, materials in the table get the first ids (in table order)
+SPECIES_INDEX = dict()
 
-REGISTRY = dict()
 def register(*material_classes):
     for material_class in material_classes:
-        key = material_class()._name
-        if key in REGISTRY:
+        # Table materials name their row, other materials have to be built to find their name
+        key = material_class._name if issubclass(material_class, TableMaterial) else material_class()._name
+        if key in REGISTRY._classes:
             raise Exception(f"Cannot register the same Material ({key}) Twice!")
         REGISTRY[key] = material_class
 
+def get_species_id(name):
+    """
+    Args:
+        name (str): The name of a material
+    Returns:
+        int: The species id of the material (materials outside the table are given a new id)
+    """
+    sid = SPECIES_INDEX.get(name)
+    if sid is None:
+        MATERIAL_TABLE._load()
+        sid = SPECIES_INDEX.get(name)
+        if sid is None:
+            sid = SPECIES_INDEX[name] = len(SPECIES_INDEX)
+    return sid
+
+def _record_property(field):
+    """A Material property stored in its species record"""
+    def fget(self):
+        return getattr(self._record, field)
+    def fset(self, value):
+        self._record = self._record._replace(**{field: value})
+        if self._vessel is not None:
+            self._vessel._sync_record(self)
+    return property(fget, fset)
+
 class Material:
+    __slots__ = ("_vessel", "_slot", "_record", "_polarity", "temperature", "pressure", "_phase", "charge", "_mol",
+        "_solute", "_solvent")
     def __init__(self,
                  name="",
                  density={'s': 1.0, 'l': 1.0, 'g': 1.0},  # in g/cm**3
@@ -66,37 +372,55 @@ class Material:
                  spectra_no_overlap=None,
                  index=None
                  ):
-        
-        #properties that can change
-        self.polarity = polarity
+        #dealing with spectra
+        if spectra_overlap is None:
+            spectra_overlap=np.zeros([0,3])
+        if spectra_no_overlap is None:
+            spectra_no_overlap=np.zeros([0,3])
+
+        #Properties likely to remain constant
+        record = SpeciesRecord(name, molar_mass, _density_tuple(density), color, boiling_point, melting_point, specific_heat,
+            enthalpy_fusion, enthalpy_vapor, spectra_overlap, spectra_no_overlap, index)
+        self._init_state(record, polarity, temperature, pressure, phase, charge, solute, solvent, mol)
+
+    def _init_state(self, record, polarity, temperature, pressure, phase, charge, solute, solvent, mol=0):
+        """Sets up a material from a species record and the properties which are not shared"""
+        #The vessel (and slot) storing mol and phase, see Vessel.material_dict
+        self._vessel = None
+        self._slot = -1
+        self._record = record
+
+        #properties that can change (mol, phase and polarity move into the vessel arrays once the material is in a vessel)
+        self._polarity = polarity
         self.temperature = temperature
         self.pressure = pressure
-        self.phase = phase
+        self._phase = PHASE_INDEX[phase]
         self.charge = charge
-        self.mol = mol
-
-        #Properties likely to remain constant
-        self._name = name
-        self._molar_mass = molar_mass
-        self._density = density
-        self._color = color
+        self._mol = mol
         self._solute = solute
         self._solvent = solvent
-        self._boiling_point = boiling_point
-        self._melting_point = melting_point
-        self._specific_heat = specific_heat
-        self._enthalpy_fusion = enthalpy_fusion
-        self._enthalpy_vapor = enthalpy_vapor
 
-        #dealing with spectra
-        if spectra_overlap is None:
-            spectra_overlap=np.zeros([0,3])
-        if spectra_no_overlap is None:
-            spectra_no_overlap=np.zeros([0,3])
-        
-        self.spectra_overlap = spectra_overlap
-        self.spectra_no_overlap = spectra_no_overlap
-        self._index = index
+    #Properties shared by every material of the same species (see SpeciesRecord)
+    _name = _record_property("name")
+    _molar_mass = _record_property("molar_mass")
+    @property
+    def _density(self):
+        """dict: The density of each phase (see SpeciesRecord.density for the same as a tuple)"""
+        return dict(zip(PHASES[:-1], self._record.density))
+    @_density.setter
+    def _density(self, density):
+        self._record = self._record._replace(density=_density_tuple(density))
+        if self._vessel is not None:
+            self._vessel._sync_record(self)
+    _color = _record_property("color")
+    _boiling_point = _record_property("boiling_point")
+    _melting_point = _record_property("melting_point")
+    _specific_heat = _record_property("specific_heat")
+    _enthalpy_fusion = _record_property("enthalpy_fusion")
+    _enthalpy_vapor = _record_property("enthalpy_vapor")
+    spectra_overlap = _record_property("spectra_overlap")
+    spectra_no_overlap = _record_property("spectra_no_overlap")
+    _index = _record_property("index")
 
     #Hashing / Naming properties
     def __repr__(self):
@@ -105,6 +429,53 @@ class Material:
         return hash(self._name)
     def __eq__(self,other):
         return self._name==other._name
+    # Amount, phase and polarity live in the arrays of the vessel holding this material (if there is one)
+    @property
+    def mol(self):
+        if self._vessel is None:
+            return self._mol
+        return self._vessel._mol[self._slot]
+    @mol.setter
+    def mol(self, value):
+        if self._vessel is None:
+            self._mol = value
+        else:
+            self._vessel._mol[self._slot] = value
+            self._vessel._aggregates = None
+    @property
+    def phase(self):
+        return PHASES[self.phase_code]
+    @phase.setter
+    def phase(self, value):
+        if self._vessel is None:
+            self._phase = PHASE_INDEX[value]
+        else:
+            self._vessel._phase[self._slot] = PHASE_INDEX[value]
+            self._vessel._aggregates = None
+    @property
+    def phase_code(self):
+        """int: The index of the phase in PHASES"""
+        if self._vessel is None:
+            return self._phase
+        return self._vessel._phase[self._slot]
+    @property
+    def polarity(self):
+        if self._vessel is None:
+            return self._polarity
+        return self._vessel._polarity[self._slot]
+    @polarity.setter
+    def polarity(self, value):
+        if self._vessel is None:
+            self._polarity = value
+        else:
+            self._vessel._polarity[self._slot] = value
+            self._vessel._settled = None
+    def _unbind(self):
+        """Moves mol, phase and polarity out of the vessel arrays and back into this object"""
+        mol, phase, polarity = self.mol, self.phase_code, self.polarity
+        self._vessel = None
+        self._slot = -1
+        self._mol, self._phase, self._polarity = float(mol), int(phase), float(polarity)
     # Less mutable properties
     @property
     def molar_mass(self):
@@ -124,10 +495,10 @@ class Material:
         return self.mol*self._molar_mass*self._specific_heat
     @property
     def litres(self):
-        return 1e-3*self.mol*self._molar_mass/self._density[self.phase]
+        return 1e-3*self.mol*self._molar_mass/self._record.density[self.phase_code]
     @property
     def litres_per_mol(self):
-        return 1e-3*self._molar_mass/self._density[self.phase]
+        return 1e-3*self._molar_mass/self._record.density[self.phase_code]
     @property
     def vapour_enthalpy(self):
         return self.mol*self._enthalpy_vapor
@@ -145,7 +516,7 @@ class Material:
         mat = type(self)()
         mat.mol=diff
 
-        mat.phase=self.phase
+        mat._phase=int(self.phase_code)
         mat._solute=self._solute
         mat._solvent=self._solvent
         return mat
@@ -176,9 +547,9 @@ class Material:
     def get_density(self, per_L=True):
         # need to convert to g/dm^3 in order to get volume in litres
         if per_L:
-            return self._density[self.phase] * 1000
+            return self._record.density[self.phase_code] * 1000
         else:
-            return self._density[self.phase]
+            return self._record.density[self.phase_code]
     
     def is_solute(self):
         return self._solute
@@ -195,6 +566,7 @@ class Material:
             self._solvent = False
         elif not flag:
             self._solute = False
+        self._sync_flags()
 
     def set_solvent_flag(self,
                          flag,
@@ -204,6 +576,13 @@ class Material:
             self._solute = False
         elif not flag:
             self._solvent = False
+        self._sync_flags()
+
+    def _sync_flags(self):
+        if self._vessel is not None:
+            self._vessel._is_solute[self._slot] = self._solute
+            self._vessel._is_solvent[self._slot] = self._solvent
+            self._vessel._settled = None
 
     def set_specific_heat(self, specific_heat):
         self._specific_heat = specific_heat
@@ -226,171 +605,62 @@ class Material:
     def get_index(self):
         return self._index
 
+class TableMaterial(Material):
+    """
+    A Material with the properties given by its row of the material table (see :data:`MATERIAL_TABLE`).
+    Subclasses only have to set `_name` to the name of the row.
+    """
+    __slots__ = ()
+    _name = ""
+    def __init__(self, mol=0):
+        record, props = MATERIAL_TABLE.species(self._name)
+        self._init_state(record, mol=mol, **props)
+
 ## ---------- ## PRE-DEFINED MATERIALS ## ---------- ##
 
-class Air(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='Air',
-                         density={'s': None, 'l': None, 'g': 1.225e-3},  # in g/cm^3
-                         temperature=297,  # in K
-                         pressure=1,
-                         phase='g',
-                         molar_mass=28.963,  # in g/mol
-                         color=0.65,
-                         specific_heat=1.0035,  # in J/g*K
-                         index=0
-                         )
-
-
-class H2O(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='H2O',
-                         density={'s': None, 'l': 0.997, 'g': None},
-                         polarity=abs(2 * 1.24 * np.cos((109.5 / 2) * (np.pi / 180.0))),
-                         temperature=298,
-                         pressure=1,
-                         phase='l',
-                         molar_mass=18.015,
-                         color=0.2,
-                         charge=0.0,
-                         boiling_point=373.15,
-                         solute=False,
-                         solvent=True,
-                         specific_heat=4.1813,
-                         enthalpy_vapor=40650.0,
-                         index=1
-                         )
-
-
-class H(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='H',
-                         density={'s': None, 'l': None, 'g': 8.9e-5},
-                         polarity=0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=1.008,
-                         color=0.1,
-                         charge=0.0,
-                         boiling_point=20.25,
-                         index=2
-                         )
-
-
-class H2(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='H2',
-                         density={'s': None, 'l': None, 'g': 8.9e-5},
-                         polarity=0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=2.016,
-                         color=0.1,
-                         charge=0.0,
-                         boiling_point=20.25,
-                         specific_heat=14.304,
-                         index=3
-                         )
-
-
-class O(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='O',
-                         density={'s': None, 'l': None, 'g': 1.429e-3},
-                         polarity=0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=15.999,
-                         color=0.15,
-                         charge=0.0,
-                         boiling_point=90.188,
-                         specific_heat=None,
-                         index=4
-                         )
-
-
-class O2(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='O2',
-                         density={'s': None, 'l': None, 'g': 1.429e-3},
-                         polarity=0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=31.999,
-                         color=0.1,
-                         charge=0.0,
-                         boiling_point=90.188,
-                         specific_heat=0.918,
-                         index=5
-                         )
-
-
-class O3(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='O3',
-                         density={'s': None, 'l': None, 'g': 2.144e-3},
-                         polarity=abs(1 + 2 * -1 * np.cos((116.8 / 2) * (np.pi / 180.0))),
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=47.998,
-                         color=0.1,
-                         charge=-1.0,
-                         boiling_point=161.15,
-                         specific_heat=None,
-                         index=6
-                         )
-
-
-class C6H14(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='C6H14',
-                         density={'s': None, 'l': 0.655, 'g': None},
-                         polarity=0.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='l',
-                         molar_mass=86.175,
-                         color=0.9,
-                         charge=0.0,
-                         solvent=True,
-                         boiling_point=342.15,
-                         specific_heat=2.26,
-                         index=7
-                         )
-
-
-class NaCl(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='NaCl',
-                         density={'s': 2.165, 'l': 2.165, 'g': None},
-                         polarity=1.5,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         molar_mass=58.443,
-                         color=0.4,
-                         charge=0.0,
-                         solute=False,
-                         boiling_point=1738.0,
-                         specific_heat=0.853,
-                         enthalpy_fusion=27950.0,
-                         enthalpy_vapor=229700.0,
-                         index=8
-                         )
+class Air(TableMaterial):
+    __slots__ = ()
+    _name = 'Air'
+
+
+class H2O(TableMaterial):
+    __slots__ = ()
+    _name = 'H2O'
+
+
+class H(TableMaterial):
+    __slots__ = ()
+    _name = 'H'
+
+
+class H2(TableMaterial):
+    __slots__ = ()
+    _name = 'H2'
+
+
+class O(TableMaterial):
+    __slots__ = ()
+    _name = 'O'
+
+
+class O2(TableMaterial):
+    __slots__ = ()
+    _name = 'O2'
+
+
+class O3(TableMaterial):
+    __slots__ = ()
+    _name = 'O3'
+
+
+class C6H14(TableMaterial):
+    __slots__ = ()
+    _name = 'C6H14'
+
+
+class NaCl(TableMaterial):
+    __slots__ = ()
+    _name = 'NaCl'
 
     def dissolve(self):
         dis_Na = Na()
@@ -410,25 +680,9 @@ class NaCl(Material):
         return {dis_Na: 1, dis_Cl: 1}
 
 # Polarity is dependant on charge for atoms
-class Na(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='Na',
-                         density={'s': 0.968, 'l': 0.856, 'g': None},
-                         polarity=0.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         solute=True,
-                         molar_mass=22.990,
-                         color=0.85,
-                         charge=0.0,
-                         boiling_point=1156.0,
-                         specific_heat=1.23,
-                         enthalpy_fusion=2600.0,
-                         enthalpy_vapor=97700.0,
-                         index=9
-                         )
+class Na(TableMaterial):
+    __slots__ = ()
+    _name = 'Na'
 
     def precipitate(self):
         prep_Na = Na()
@@ -451,25 +705,9 @@ class Na(Material):
 
 
 # Note: Cl is very unstable when not an aqueous ion
-class Cl(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='Cl',
-                         density={'s': None, 'l': 1.558, 'g': 3.214e-3},
-                         polarity=2.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='l',
-                         solute=True,
-                         molar_mass=35.453,
-                         color=0.8,
-                         charge=-1.0,
-                         boiling_point=1156.0,
-                         specific_heat=0.48,
-                         enthalpy_fusion=3200.0,
-                         enthalpy_vapor=10200.0,
-                         index=10
-                         )
+class Cl(TableMaterial):
+    __slots__ = ()
+    _name = 'Cl'
 
     def precipitate(self):
         prep_Na = Na()
@@ -490,678 +728,154 @@ class Cl(Material):
 
         return [[[prep_Na, prep_Cl], [prep_NaCl]]]
 
-class Cl2(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='Cl2',
-                         density={'s': None, 'l': None, 'g': 2.898e-3},
-                         polarity=0.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=70.906,
-                         color=0.8,
-                         charge=0.0,
-                         boiling_point=238.55,
-                         specific_heat=1.0,
-                         index=11
-                         )
-
-
-class LiF(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='LiF',
-                         density={'s': 2.640, 'l': None, 'g': None},
-                         polarity=1.5,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         molar_mass=25.939,
-                         color=0.9,
-                         charge=0.0,
-                         boiling_point=1953.15,
-                         specific_heat=1.0,
-                         index=12
-                         )
-
-
-class Li(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='Li',
-                         density={'s': 0.534, 'l': None, 'g': None},
-                         polarity=0.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         molar_mass=6.941,
-                         color=0.95,
-                         charge=0.0,
-                         boiling_point=1603.15,
-                         specific_heat=1.0,
-                         index=13
-                         )
-
-
-class F2(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='F2',
-                         density={'s': None, 'l': None, 'g': 1.696e-3},
-                         polarity=0.0,
-                         temperature=298,
-                         pressure=1,
-                         phase='g',
-                         molar_mass=37.997,
-                         color=0.8,
-                         charge=0.0,
-                         boiling_point=85.15,
-                         specific_heat=0.824,
-                         index=15
-                         )
-
-
-class CuSO4(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='CuS04',
-                         density={'s': 3.6, 'l': None, 'g': None},
-                         polarity=1.5,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         molar_mass=159.6,
-                         color=0.9,
-                         charge=0.0,
-                         boiling_point=923,
-                         melting_point=383,
-                         specific_heat=0.853,
-                         enthalpy_fusion=27950.0,
-                         enthalpy_vapor=229700.0,
-                         index=8
-                         )
-
-
-class CuSO4Pentahydrate(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         name='CuS04*5H2O',
-                         density={'s': 2.286, 'l': None, 'g': None},
-                         polarity=1.5,
-                         temperature=298,
-                         pressure=1,
-                         phase='s',
-                         molar_mass=249.68,
-                         color=0.9,
-                         charge=0.0,
-                         boiling_point=923,
-                         melting_point=383,
-                         specific_heat=0.853,
-                         enthalpy_fusion=27950.0,
-                         enthalpy_vapor=229700.0,
-                         index=8
-                         )
+class Cl2(TableMaterial):
+    __slots__ = ()
+    _name = 'Cl2'
+
+
+class LiF(TableMaterial):
+    __slots__ = ()
+    _name = 'LiF'
+
+
+class Li(TableMaterial):
+    __slots__ = ()
+    _name = 'Li'
+
+
+class F2(TableMaterial):
+    __slots__ = ()
+    _name = 'F2'
+
+
+class CuSO4(TableMaterial):
+    __slots__ = ()
+    _name = 'CuS04'
+
+
+class CuSO4Pentahydrate(TableMaterial):
+    __slots__ = ()
+    _name = 'CuS04*5H2O'
 
 
 ## ---------- ## HYDROCARBONS ## ---------- ##
 
-class Dodecane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='dodecane',
-            density={'s': None, 'l': 0.75, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.15,
-            charge=0.0,
-            boiling_point=489.5,
-            melting_point=263.6,
-            solute=True,
-            specific_heat=2.3889,  # in J/g*K
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=16
-        )
+class Dodecane(TableMaterial):
+    __slots__ = ()
+    _name = 'dodecane'
 
 
-class OneChlorohexane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='1-chlorohexane',
-            density={'s': None, 'l': 0.879, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.1,
-            charge=0.0,
-            boiling_point=408.2,
-            melting_point=179.2,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=15490.0,
-            enthalpy_vapor=42800.0,
-            spectra_overlap=spec.S_1_chlorohexane,
-            spectra_no_overlap=spec.S_1_chlorohexane,
-            index=17
-        )
+class OneChlorohexane(TableMaterial):
+    __slots__ = ()
+    _name = '1-chlorohexane'
 
 
-class TwoChlorohexane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='2-chlorohexane',
-            density={'s': None, 'l': 0.87, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.15,
-            charge=0.0,
-            boiling_point=395.2,
-            melting_point=308.3,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=11970.0,
-            enthalpy_vapor=43820.0,
-            spectra_overlap=spec.S_2_chlorohexane,
-            spectra_no_overlap=spec.S_2_chlorohexane,
-            index=18
-        )
+class TwoChlorohexane(TableMaterial):
+    __slots__ = ()
+    _name = '2-chlorohexane'
 
 
-class ThreeChlorohexane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='3-chlorohexane',
-            density={'s': None, 'l': 0.9, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.2,
-            charge=0.0,
-            boiling_point=396.2,
-            melting_point=308.3,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=11970.0,
-            enthalpy_vapor=32950.0,
-            spectra_overlap=spec.S_3_chlorohexane,
-            spectra_no_overlap=spec.S_3_chlorohexane,
-            index=19
-        )
+class ThreeChlorohexane(TableMaterial):
+    __slots__ = ()
+    _name = '3-chlorohexane'
 
 
-class FiveMethylundecane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='5-methylundecane',
-            density={'s': None, 'l': 0.75, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.25,
-            charge=0.0,
-            boiling_point=481.1,
-            melting_point=255.2,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=20
-        )
+class FiveMethylundecane(TableMaterial):
+    __slots__ = ()
+    _name = '5-methylundecane'
 
 
-class FourEthyldecane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='4-ethyldecane',
-            density={'s': None, 'l': 0.75, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.3,
-            charge=0.0,
-            boiling_point=480.1,
-            melting_point=254.2,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=21
-        )
+class FourEthyldecane(TableMaterial):
+    __slots__ = ()
+    _name = '4-ethyldecane'
 
 
-class FiveSixDimethyldecane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='5,6-dimethyldecane',
-            density={'s': None, 'l': 0.757, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.35,
-            charge=0.0,
-            boiling_point=474.2,
-            melting_point=222.4,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=22
-        )
+class FiveSixDimethyldecane(TableMaterial):
+    __slots__ = ()
+    _name = '5,6-dimethyldecane'
 
 
-class FourEthylFiveMethylnonane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='4-ethyl-5-methylnonane',
-            density={'s': None, 'l': 0.75, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.4,
-            charge=0.0,
-            boiling_point=476.3,
-            melting_point=224.5,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=23
-        )
+class FourEthylFiveMethylnonane(TableMaterial):
+    __slots__ = ()
+    _name = '4-ethyl-5-methylnonane'
 
 
-class FourFiveDiethyloctane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='4,5-diethyloctane',
-            density={'s': None, 'l': 0.768, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.45,
-            charge=0.0,
-            boiling_point=470.2,
-            melting_point=222.4,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            index=24
-        )
+class FourFiveDiethyloctane(TableMaterial):
+    __slots__ = ()
+    _name = '4,5-diethyloctane'
 
 
-class Ethoxyethane(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='ethoxyethane',
-            density={'s': None, 'l': 0.713, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=74.123,
-            color=0.5,
-            charge=0.0,
-            boiling_point=34.6,
-            melting_point=-116.3,
-            solute=False,
-            solvent=True,
-            specific_heat=2.253,
-            enthalpy_fusion=7190.0,
-            enthalpy_vapor=27250.0,
-            index=25
-        )
+class Ethoxyethane(TableMaterial):
+    __slots__ = ()
+    _name = 'ethoxyethane'
 
 
-class EthylAcetate(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='ethyl acetate',
-            density={'s': None, 'l': 0.902, 'g': None},
-            polarity=0.654,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=88.106,
-            color=0.4,
-            charge=0.0,
-            boiling_point=350,
-            melting_point=189.6,
-            solvent=True,
-            solute=False,
-            specific_heat=1.904,  # in J/g*K
-            enthalpy_fusion=10480,
-            enthalpy_vapor=31940,
-            index=26
-        )
+class EthylAcetate(TableMaterial):
+    __slots__ = ()
+    _name = 'ethyl acetate'
 
 
-class DiEthylEther(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='diethyl ether',
-            density={'s': None, 'l': 0.7134, 'g': None},
-            polarity=1.3,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=74.123,
-            color=0.05,
-            charge=0.0,
-            boiling_point=307.8,
-            melting_point=156.8,
-            solvent=True,
-            specific_heat=119.46,  # in J/g*K
-            enthalpy_fusion=-252.7e3,
-            enthalpy_vapor=27.247e3,
-            index=29
-        )
+class DiEthylEther(TableMaterial):
+    __slots__ = ()
+    _name = 'diethyl ether'
 
-class A(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_A',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.15,
-            charge=0.0,
-            boiling_point=489.5,
-            melting_point=263.6,
-            solute=True,
-            specific_heat=2.3889,  # in J/g*K
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_A,
-            spectra_no_overlap=spec.S_A,
-            index=30
-        )
+class A(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_A'
 
-class B(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_B',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.1,
-            charge=0.0,
-            boiling_point=408.2,
-            melting_point=179.2,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=15490.0,
-            enthalpy_vapor=42800.0,
-            spectra_overlap=spec.S_B,
-            spectra_no_overlap=spec.S_B,
-            index=31
-        )
+class B(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_B'
 
 
-class C(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_C',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.15,
-            charge=0.0,
-            boiling_point=395.2,
-            melting_point=308.3,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=11970.0,
-            enthalpy_vapor=43820.0,
-            spectra_overlap=spec.S_C,
-            spectra_no_overlap=spec.S_C,
-            index=32
-        )
+class C(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_C'
 
 
-class D(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_D',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=120.62,
-            color=0.2,
-            charge=0.0,
-            boiling_point=396.2,
-            melting_point=308.3,
-            solute=False,
-            specific_heat=1.5408,
-            enthalpy_fusion=11970.0,
-            enthalpy_vapor=32950.0,
-            spectra_overlap=spec.S_D,
-            spectra_no_overlap=spec.S_D,
-            index=33
-        )
+class D(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_D'
 
 
-class E(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_E',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.25,
-            charge=0.0,
-            boiling_point=481.1,
-            melting_point=255.2,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_E,
-            spectra_no_overlap=spec.S_E,
-            index=34
-        )
+class E(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_E'
 
 
-class F(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_F',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.3,
-            charge=0.0,
-            boiling_point=480.1,
-            melting_point=254.2,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_F,
-            spectra_no_overlap=spec.S_F,
-            index=35
-        )
+class F(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_F'
 
 
-class G(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_G',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.35,
-            charge=0.0,
-            boiling_point=474.2,
-            melting_point=222.4,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_G,
-            spectra_no_overlap=spec.S_G,
-            index=36
-        )
+class G(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_G'
 
 
-class H(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_H',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.4,
-            charge=0.0,
-            boiling_point=476.3,
-            melting_point=224.5,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_H,
-            spectra_no_overlap=spec.S_H,
-            index=37
-        )
+class H(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_H'
 
 
-class I(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='fict_I',
-            density={'s': 2.165, 'l': 2.165, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='l',
-            molar_mass=170.34,
-            color=0.45,
-            charge=0.0,
-            boiling_point=470.2,
-            melting_point=222.4,
-            solute=False,
-            specific_heat=2.3889,
-            enthalpy_fusion=19790.0,
-            enthalpy_vapor=41530.0,
-            spectra_overlap=spec.S_I,
-            spectra_no_overlap=spec.S_I,
-            index=38
-        )
+class I(TableMaterial):
+    __slots__ = ()
+    _name = 'fict_I'
 
 ##------Indicators------##
 
 
-class MethylRed(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='methyl red',
-            density={'s': 0.902, 'l': None, 'g': None},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='s',
-            molar_mass=88.106,
-            color=0.6,
-            charge=0.0,
-            boiling_point=630,
-            melting_point=455,
-            solute=True,
-            specific_heat=1.904,  # in J/g*K
-            enthalpy_fusion=10480,
-            enthalpy_vapor=31940,
-            index=27
-        )
+class MethylRed(TableMaterial):
+    __slots__ = ()
+    _name = 'methyl red'
 
 
 ##-------Acids-------##
 
 
-class HCl(Material):
-    def __init__(self, mol=0):
-        super().__init__(mol=mol,
-                         
-            name='HCl',
-            density={'s': None, 'l': None, 'g': 1.48e-3},
-            polarity=0.0,
-            temperature=298,
-            pressure=1,
-            phase='g',
-            molar_mass=88.106,
-            color=0.3,
-            charge=0.0,
-            boiling_point=350,
-            melting_point=189.6,
-            solute=True,
-            specific_heat=1.904,  # in J/g*K
-            enthalpy_fusion=10480,
-            enthalpy_vapor=31940,
-            index=28
-        )
+class HCl(TableMaterial):
+    __slots__ = ()
+    _name = 'HCl'
 
 
-register(*Material.__subclasses__())
\ No newline at end of file
+register(*TableMaterial.__subclasses__())
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Generates rate kernels specialized to one reaction network
+
+:title: rate_kernels.py
+
+The generic :func:`~chemistrylab.reactions.reaction.mass_action_rates` loops over every entry of
+`stoich_coeff_arr` and `conc_coeff_arr` with float powers. For a given :class:`ReactInfo` the network is fixed,
+so this module writes out straight-line numba functions for it (zero coefficients are skipped and integer powers
+become multiplications). The generated modules are stored (along with numba's compiled code) in a cache directory.
+They are keyed by a hash of the generated source rather than of the reaction file, so reaction files describing
+the same network share their kernels, and edits which do not change the network do not recompile them.
+"""
+import hashlib
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+from typing import NamedTuple, Callable
+
+import numpy as np
+from numba import types
+
+from chemistrylab.reactions.reaction_info import ReactInfo
+
+# Bump this whenever the generated code changes, so old cache entries are not reused
+VERSION = 2
+
+#: Type of a generated rates function ``rates(k, conc, out)``, which writes :math:`\\frac{dy}{dt}` into out.
+#: ``reaction_rates(k, conc, out)`` has the same type and writes the rate of each reaction into out instead.
+RATES_TYPE = types.FunctionType(types.void(types.float64[::1], types.float64[::1], types.float64[::1]))
+#: Type of a generated jacobian function ``jacobian(k, conc, out)``, which writes the [M,M] jacobian into out
+JACOBIAN_TYPE = types.FunctionType(types.void(types.float64[::1], types.float64[::1], types.float64[:, ::1]))
+
+#: Where generated kernels are kept (the CHEMISTRYLAB_CACHE environment variable overrides the default)
+CACHE_DIR = os.path.join(
+    os.environ.get("CHEMISTRYLAB_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "chemistrylab")),
+    "rate_kernels"
+)
+
+
+class RateKernels(NamedTuple):
+    key: str
+    rates: Callable
+    jacobian: Callable
+    reaction_rates: Callable
+
+RateKernels.key.__doc__ = "Hash of the generated source"
+RateKernels.rates.__doc__ = "Compiled ``rates(k, conc, out)`` (see :data:`RATES_TYPE`)"
+RateKernels.jacobian.__doc__ = "Compiled ``jacobian(k, conc, out)`` (see :data:`JACOBIAN_TYPE`)"
+RateKernels.reaction_rates.__doc__ = "Compiled ``reaction_rates(k, conc, out)`` (see :data:`RATES_TYPE`)"
+
+
+def _power(var, p):
+    """Source for var**p, using multiplications for small integer powers"""
+    if float(p).is_integer() and 1 <= p <= 4:
+        return " * ".join([var] * int(p))
+    return f"{var} ** {float(p)!r}"
+
+
+def _linear(coeffs, names):
+    """Source for sum(c*x), skipping zero coefficients"""
+    terms = []
+    for c, x in zip(coeffs, names):
+        if c == 1:
+            terms.append(f"+ {x}")
+        elif c == -1:
+            terms.append(f"- {x}")
+        elif c != 0:
+            terms.append(f"{'+' if c > 0 else '-'} {abs(float(c))!r} * {x}")
+    if not terms:
+        return "0.0"
+    src = " ".join(terms)
+    return src[2:] if src[0] == "+" else "-" + src[2:]
+
+
+def generate_source(react_info: ReactInfo, cache: bool = True) -> str:
+    """
+    Args:
+        react_info (ReactInfo): The reaction network
+        cache (bool): Whether the generated functions should use numba's on-disk cache
+
+    Returns:
+        str: Source of a module defining ``rates`` and ``jacobian`` (see :data:`RATES_TYPE` and :data:`JACOBIAN_TYPE`)
+        which give the same results as :func:`~chemistrylab.reactions.reaction.mass_action_rates` and
+        :func:`~chemistrylab.reactions.reaction.mass_action_jacobian`, along with ``reaction_rates`` which gives the
+        rate of each reaction (as used by :func:`~chemistrylab.reactions.reaction.newton_solve_k`).
+    """
+    stoich = np.asarray(react_info.stoich_coeff_arr, dtype=np.float64)
+    conc_coeff = np.asarray(react_info.conc_coeff_arr, dtype=np.float64)
+    num_reagents = len(react_info.REACTANTS)
+    n, n_rxn = conc_coeff.shape
+    reagents = [[j for j in range(num_reagents) if stoich[i, j] != 0] for i in range(n_rxn)]
+    used = sorted(set(j for r in reagents for j in r))
+    clip = [f"    c{j} = max(conc[{j}], 0.0)" for j in used]
+
+    lines = [
+        f"# Generated by chemistrylab.reactions.rate_kernels (version {VERSION}), do not edit",
+        f"# reactants: {', '.join(react_info.REACTANTS)}",
+        "import numba",
+        "from chemistrylab.reactions.rate_kernels import RATES_TYPE, JACOBIAN_TYPE",
+        "",
+        f"@numba.njit(RATES_TYPE.signature, cache={cache})",
+        "def rates(k, conc, out):",
+        *clip,
+    ]
+    rate_lines = [f"    r{i} = " + " * ".join([f"k[{i}]"] + [_power(f"c{j}", stoich[i, j]) for j in reagents[i]])
+                  for i in range(n_rxn)]
+    lines += rate_lines
+    rate_names = [f"r{i}" for i in range(n_rxn)]
+    for m in range(n):
+        lines.append(f"    out[{m}] = " + _linear(conc_coeff[m], rate_names))
+
+    lines += [
+        "",
+        f"@numba.njit(RATES_TYPE.signature, cache={cache})",
+        "def reaction_rates(k, conc, out):",
+        *clip,
+        *rate_lines,
+        *[f"    out[{i}] = r{i}" for i in range(n_rxn)],
+    ]
+
+    lines += [
+        "",
+        f"@numba.njit(JACOBIAN_TYPE.signature, cache={cache})",
+        "def jacobian(k, conc, out):",
+        *clip,
+        "    out[:, :] = 0.0",
+    ]
+    # d(rate_i)/d(conc_j) for every reagent of every reaction
+    derivs = {}
+    for i in range(n_rxn):
+        for j in reagents[i]:
+            p = stoich[i, j]
+            others = [_power(f"c{l}", stoich[i, l]) for l in reagents[i] if l != j]
+            if p == 1:
+                factor = []
+            elif float(p).is_integer() and 1 < p <= 5:
+                factor = [repr(float(p)), _power(f"c{j}", p - 1)]
+            else:
+                #non-integer and negative powers of 0 (from negative or empty concentrations) have no derivative
+                factor = [f"({float(p)!r} * c{j} ** {float(p - 1)!r} if c{j} > 0 else 0.0)"]
+            derivs[i, j] = f"d{i}_{j}"
+            lines.append(f"    d{i}_{j} = " + " * ".join([f"k[{i}]"] + factor + others))
+    for m in range(n):
+        for j in used:
+            rxns = [i for i in range(n_rxn) if (i, j) in derivs and conc_coeff[m, i] != 0]
+            if rxns:
+                lines.append(f"    out[{m}, {j}] = " + _linear([conc_coeff[m, i] for i in rxns], [derivs[i, j] for i in rxns]))
+    return "\n".join(lines) + "\n"
+
+
+_LOADED = dict()
+_LOCK = threading.Lock()
+
+
+def _import(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # numba's cache looks the module up by name when loading compiled code
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def compile_reaction(react_info: ReactInfo, cache_dir: str = None) -> RateKernels:
+    """
+    Generates (or loads from the cache) the rate kernels of a reaction network.
+
+    Args:
+        react_info (ReactInfo): The reaction network
+        cache_dir (str): Directory for the generated modules (defaults to :data:`CACHE_DIR`)
+
+    Returns:
+        RateKernels: The compiled kernels. If the cache directory cannot be written to they are compiled in memory.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    source = generate_source(react_info)
+    key = hashlib.sha1(source.encode()).hexdigest()[:20]
+    name = f"_chemistrylab_rates_{key}"
+    path = os.path.join(cache_dir, name + ".py")
+    with _LOCK:
+        if path in _LOADED:
+            return _LOADED[path]
+        try:
+            if not os.path.exists(path):
+                os.makedirs(cache_dir, exist_ok=True)
+                # write then rename so other processes never import a partial file
+                fd, tmp = tempfile.mkstemp(suffix=".py", dir=cache_dir)
+                with os.fdopen(fd, "w") as f:
+                    f.write(source)
+                os.replace(tmp, path)
+            module = _import(path, name)
+        except OSError:
+            namespace = dict()
+            exec(compile(generate_source(react_info, cache=False), name, "exec"), namespace)
+            module = type(sys)(name)
+            module.__dict__.update(namespace)
+        kernels = RateKernels(key, module.rates, module.jacobian, module.reaction_rates)
+        _LOADED[path] = kernels
+    return kernels
@@ -1,10 +1,13 @@
+from collections import OrderedDict
 import numpy as np
 import numba
+from numba import prange, float64, int64
 from scipy.integrate import solve_ivp
 from chemistrylab import material,vessel
 from typing import NamedTuple, Tuple, Callable, Optional, List
 
 from chemistrylab.reactions.reaction_info import ReactInfo
+from chemistrylab.reactions.rate_kernels import RATES_TYPE, JACOBIAN_TYPE, compile_reaction
 
 
 def _get_amounts(materials: Tuple[str], vessel: vessel.Vessel):
@@ -25,14 +28,27 @@ def _set_amounts(materials, solvents, material_classes, n, vessel):
             mat = material_classes[i]()
             mat.mol=amount
             vessel.material_dict[key] = mat
-    vessel.validate_solvents()
-    vessel.validate_solutes()
+    vessel._commit(overflow=False)
         
 #####################################################################################################################################
 
 
 
 
+@numba.jit(nopython=True)
+def arrhenius(pre_exp_arr, activ_energy_arr, temp):
+    """
+    Args:
+        temp (float): The temperature of the reactions
+        *_arr (np.array): See :class:`~chemistrylab.reactions.reaction_info.ReactInfo`
+
+    Returns:
+        np.array: The reaction constants :math:`k = A e^{-E_a/RT}`
+    """
+    R = 8.314462619
+    return pre_exp_arr * np.exp((-1.0 * activ_energy_arr) / (R * temp))
+
+
 @numba.jit(nopython=True)
 def get_rates(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr, num_reagents, temp, conc):
     """
@@ -47,14 +63,16 @@ def get_rates(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr, n
     Returns:
         np.array: Rates of change in concentration :math:`\\frac{dy}{dt}`.
     """
+    k = arrhenius(pre_exp_arr, activ_energy_arr, temp)
+    return mass_action_rates(stoich_coeff_arr, k, conc_coeff_arr, num_reagents, conc)
 
-    
-    R = 8.314462619
-    
+
+@numba.jit(nopython=True)
+def mass_action_rates(stoich_coeff_arr, k, conc_coeff_arr, num_reagents, conc):
+    """
+    Same as :func:`get_rates`, but with the reaction constants `k` (see :func:`arrhenius`) already computed.
+    """
     conc = np.clip(conc, 0, None)
-    #k are the reaction constants
-    k = pre_exp_arr * np.exp((-1.0 * activ_energy_arr) / (R * temp))
-        
     rates = k*1
     for i in range(len(rates)):
         for j in range(num_reagents):
@@ -68,6 +86,53 @@ def get_rates(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr, n
     return conc_change
 
 
+@numba.jit(nopython=True)
+def get_jacobian(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr, num_reagents, temp, conc):
+    """
+    Finds the Jacobian :math:`\\frac{\\partial}{\\partial y}\\frac{dy}{dt}` of the mass-action rates from :func:`get_rates`
+
+    Args:
+        num_reagents (int): The number of reactants involved in the reaction
+        temp (float): The temperature of the reactions
+        conc (float): The concentrations of the materials
+        *_arr (np.array): See :class:`~chemistrylab.reactions.reaction_info.ReactInfo`
+
+    Returns:
+        np.array: [M,M] array J where J[i,j] is the derivative of the i-th concentration change with respect to the j-th
+        concentration.
+    """
+    k = arrhenius(pre_exp_arr, activ_energy_arr, temp)
+    return mass_action_jacobian(stoich_coeff_arr, k, conc_coeff_arr, num_reagents, conc)
+
+
+@numba.jit(nopython=True)
+def mass_action_jacobian(stoich_coeff_arr, k, conc_coeff_arr, num_reagents, conc):
+    """
+    Same as :func:`get_jacobian`, but with the reaction constants `k` (see :func:`arrhenius`) already computed.
+    """
+    conc = np.clip(conc, 0, None)
+    n = conc_coeff_arr.shape[0]
+    jac = np.zeros((n, n))
+    for i in range(k.shape[0]):
+        for j in range(num_reagents):
+            power = stoich_coeff_arr[i][j]
+            if power == 0:
+                continue
+            #d(rate_i)/d(conc_j) = k_i * power * conc_j^(power-1) * prod_{l!=j} conc_l^(stoich_il)
+            if conc[j] > 0:
+                d_rate = k[i] * power * conc[j] ** (power - 1)
+            elif power == 1:
+                d_rate = k[i]
+            else:
+                continue
+            for l in range(num_reagents):
+                if l != j:
+                    d_rate *= conc[l] ** stoich_coeff_arr[i][l]
+            for m in range(n):
+                jac[m, j] += conc_coeff_arr[m][i] * d_rate
+    return jac
+
+
 @numba.jit(nopython=True)
 def newton_solve(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr, num_reagents, temp, conc, dt, N):
     """
@@ -143,7 +208,291 @@ def newton_solve(stoich_coeff_arr, pre_exp_arr, activ_energy_arr, conc_coeff_arr
                 conc[i] += conc_coeff_arr[i][j]*rates[j]
                
     return conc
-   
+
+
+@numba.jit(float64[::1](RATES_TYPE, float64[::1], float64[:, ::1], float64[::1], float64, int64), nopython=True, cache=True)
+def newton_solve_k(reaction_rates, k, conc_coeff_arr, conc, dt, N):
+    """
+    Same as :func:`newton_solve`, but with the reaction constants `k` (see :func:`arrhenius`) already computed
+    and the rate of each reaction given by the generated `reaction_rates` function of the reaction
+    (see :func:`~chemistrylab.reactions.rate_kernels.compile_reaction`).
+    """
+    #if your updates are below 5e-4 you can increase factor (I decided this is a good number)
+    targ = 5e-4
+    
+    ddt=dt/N
+    
+    factor=1
+    
+    k = ddt*k
+    
+    count=0
+        
+    while dt>0:
+        conc = np.clip(conc, 0, None)
+        #k are the reaction constants
+        
+        rates = np.empty(k.shape[0])
+        reaction_rates(k, conc, rates)
+        
+        ratio=np.max(rates)/(np.max(conc)+1e-6)
+        
+        #mess with the step size to make sure you don't get any super huge concentration changes
+        while ratio*factor<targ and factor<10:
+            factor*=2
+        while ratio*factor>0.1:
+            factor*=0.5
+            
+        if factor*ddt>=dt:
+            factor = dt/ddt
+            dt=0
+        
+        dt-=factor*ddt
+            
+        rates*=factor
+        count+=1
+        #calculate concentration changes and add them to the concentration
+        for i in range(conc.shape[0]):
+            for j in range(rates.shape[0]):
+                conc[i] += conc_coeff_arr[i][j]*rates[j]
+               
+    return conc
+
+
+# Dormand-Prince 5(4) tableau (the one scipy's RK45 uses)
+_RK45_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_RK45_A = np.array([
+    [0, 0, 0, 0, 0],
+    [1/5, 0, 0, 0, 0],
+    [3/40, 9/40, 0, 0, 0],
+    [44/45, -56/15, 32/9, 0, 0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]
+])
+_RK45_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_RK45_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+
+
+@numba.jit(nopython=True)
+def _rms(x):
+    return np.sqrt(np.mean(x*x))
+
+
+@numba.jit(nopython=True)
+def _initial_step(rates, k, y, f, dt, order, rtol, atol):
+    """First step size for an adaptive solver (scipy.integrate._ivp.common.select_initial_step)"""
+    scale = atol + np.abs(y) * rtol
+    d0 = _rms(y / scale)
+    d1 = _rms(f / scale)
+    h0 = 1e-6 if (d0 < 1e-5 or d1 < 1e-5) else 0.01 * d0 / d1
+    h0 = min(h0, dt)
+    f1 = np.empty(y.shape[0])
+    rates(k, y + h0 * f, f1)
+    d2 = _rms((f1 - f) / scale) / h0
+    if d1 <= 1e-15 and d2 <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / (order + 1))
+    return min(100 * h0, h1, dt)
+
+
+@numba.jit(float64[::1](RATES_TYPE, float64[::1], float64[::1], float64), nopython=True, cache=True)
+def rk45_solve(rates, k, conc, dt):
+    """
+    Args:
+        rates (Callable): Generated rates function of the reaction (see :func:`~chemistrylab.reactions.rate_kernels.compile_reaction`)
+        k (np.array): The reaction constants (see :func:`arrhenius`)
+        conc (np.array): The initial concentrations of the materials
+        dt (float): The amount of time to pass
+
+    Returns:
+        np.array: The final concentrations y(dt)
+
+    Compiled version of ``solve_ivp(reaction, (0, dt), conc, method='RK45').y[:, -1]``, following scipy's step size
+    control (rtol=1e-3, atol=1e-6) so both give the same answer up to round-off.
+    """
+    rtol, atol = 1e-3, 1e-6
+    y = conc.copy()
+    if dt <= 0 or y.shape[0] == 0:
+        return y
+    f = np.empty(y.shape[0])
+    rates(k, y, f)
+
+    h_abs = _initial_step(rates, k, y, f, dt, 4, rtol, atol)
+
+    K = np.empty((7, y.shape[0]))
+    t = 0.0
+    while t < dt:
+        min_step = 10 * np.abs(np.nextafter(t, np.inf) - t)
+        h_abs = max(h_abs, min_step)
+        rejected = False
+        while True:
+            if h_abs < min_step:
+                #step size underflow, scipy gives up and returns the last accepted state
+                return y
+            t_new = min(t + h_abs, dt)
+            h = t_new - t
+            h_abs = np.abs(h)
+            K[0] = f
+            for s in range(1, 6):
+                dy = np.zeros(y.shape[0])
+                for j in range(s):
+                    dy += K[j] * _RK45_A[s, j]
+                rates(k, y + dy * h, K[s])
+            y_new = np.zeros(y.shape[0])
+            for j in range(6):
+                y_new += K[j] * _RK45_B[j]
+            y_new = y + h * y_new
+            rates(k, y_new, K[6])
+            err = np.zeros(y.shape[0])
+            for j in range(7):
+                err += K[j] * _RK45_E[j]
+            scale = atol + np.maximum(np.abs(y), np.abs(y_new)) * rtol
+            error_norm = _rms(err * h / scale)
+            if error_norm < 1:
+                factor = 10.0 if error_norm == 0 else min(10.0, 0.9 * error_norm ** -0.2)
+                if rejected:
+                    factor = min(1.0, factor)
+                h_abs *= factor
+                break
+            h_abs *= max(0.2, 0.9 * error_norm ** -0.2)
+            rejected = True
+        t, y, f = t_new, y_new, K[6].copy()
+    return y
+
+
+@numba.jit(nopython=True)
+def _lu_factor(a):
+    """In-place LU decomposition with partial pivoting (for the small dense systems in :func:`rosenbrock_solve`)"""
+    n = a.shape[0]
+    piv = np.arange(n)
+    for c in range(n):
+        p = c + np.argmax(np.abs(a[c:, c]))
+        if p != c:
+            for j in range(n):
+                a[c, j], a[p, j] = a[p, j], a[c, j]
+            piv[c], piv[p] = piv[p], piv[c]
+        if a[c, c] == 0:
+            continue
+        for r in range(c + 1, n):
+            a[r, c] /= a[c, c]
+            for j in range(c + 1, n):
+                a[r, j] -= a[r, c] * a[c, j]
+    return a, piv
+
+
+@numba.jit(nopython=True)
+def _lu_solve(lu, piv, b):
+    """Solves ax=b given the output of :func:`_lu_factor`"""
+    n = b.shape[0]
+    x = b[piv].copy()
+    for r in range(n):
+        for j in range(r):
+            x[r] -= lu[r, j] * x[j]
+    for r in range(n - 1, -1, -1):
+        for j in range(r + 1, n):
+            x[r] -= lu[r, j] * x[j]
+        x[r] /= lu[r, r]
+    return x
+
+@numba.jit(float64[::1](RATES_TYPE, JACOBIAN_TYPE, float64[::1], float64[::1], float64, float64, float64),
+           nopython=True, cache=True)
+def rosenbrock_solve(rates, jacobian, k, conc, dt, rtol, atol):
+    """
+    Args:
+        rates (Callable): Generated rates function of the reaction (see :func:`~chemistrylab.reactions.rate_kernels.compile_reaction`)
+        jacobian (Callable): Generated jacobian function of the reaction
+        k (np.array): The reaction constants (see :func:`arrhenius`)
+        conc (np.array): The initial concentrations of the materials
+        dt (float): The amount of time to pass
+        rtol (float): Relative tolerance of the local error
+        atol (float): Absolute tolerance of the local error
+
+    Returns:
+        np.array: The final concentrations y(dt)
+
+    Adaptive Rosenbrock method of order 2(3) (the one used by MATLAB's ode23s). Each step solves a few linear systems
+    with :math:`W = I - h d J` (using the analytic Jacobian) instead of iterating, so stiff reactions
+    (ex. fast wurtz reactions at high temperatures) can take large steps while staying stable.
+    """
+    d = 1 / (2 + np.sqrt(2.0))
+    e32 = 6 + np.sqrt(2.0)
+    y = conc.copy()
+    n = y.shape[0]
+    if dt <= 0 or n == 0:
+        return y
+    f0 = np.empty(n)
+    f1 = np.empty(n)
+    f2 = np.empty(n)
+    jac = np.empty((n, n))
+    rates(k, y, f0)
+    h_abs = _initial_step(rates, k, y, f0, dt, 2, rtol, atol)
+    t = 0.0
+    while t < dt:
+        min_step = 10 * np.abs(np.nextafter(t, np.inf) - t)
+        h_abs = max(h_abs, min_step)
+        jacobian(k, y, jac)
+        rejected = False
+        while True:
+            if h_abs < min_step:
+                return y
+            t_new = min(t + h_abs, dt)
+            h = t_new - t
+            h_abs = np.abs(h)
+            w = -h * d * jac
+            for i in range(n):
+                w[i, i] += 1
+            lu, piv = _lu_factor(w)
+            k1 = _lu_solve(lu, piv, f0)
+            rates(k, y + 0.5 * h * k1, f1)
+            k2 = _lu_solve(lu, piv, f1 - k1) + k1
+            y_new = y + h * k2
+            rates(k, y_new, f2)
+            k3 = _lu_solve(lu, piv, f2 - e32 * (k2 - f1) - 2 * (k1 - f0))
+            scale = atol + np.maximum(np.abs(y), np.abs(y_new)) * rtol
+            error_norm = _rms((k1 - 2 * k2 + k3) * (h / 6) / scale)
+            if error_norm < 1 and np.all(np.isfinite(y_new)):
+                factor = 5.0 if error_norm == 0 else min(5.0, 0.9 * error_norm ** (-1 / 3))
+                if rejected:
+                    factor = min(1.0, factor)
+                h_abs *= factor
+                break
+            h_abs *= max(0.2, 0.9 * error_norm ** (-1 / 3)) if np.isfinite(error_norm) else 0.2
+            rejected = True
+        t, y = t_new, y_new
+        f0[:] = f2
+    return y
+
+
+@numba.jit(float64[:, ::1](RATES_TYPE, JACOBIAN_TYPE, RATES_TYPE, float64[:, ::1], float64[:, ::1],
+                           float64[:, ::1], float64[::1], float64[::1], int64, int64, float64),
+           nopython=True, parallel=True, cache=True)
+def _react_batch(rates, jacobian, reaction_rates, k, conc_coeff_arr, n, volume, dt, method, newton_steps, threshold):
+    """
+    Runs rk45_solve (method 0), newton_solve_k (1) or rosenbrock_solve (2) on each row of n (with reaction constants
+    k[b]), see :meth:`Reaction.react_batch`
+    """
+    new_n = n.copy()
+    for b in prange(n.shape[0]):
+        if n[b].sum() < 1e-12:
+            continue
+        conc = n[b] / volume[b]
+        if method == 1:
+            conc = newton_solve_k(reaction_rates, k[b], conc_coeff_arr, conc, dt[b], newton_steps)
+        elif method == 2:
+            conc = rosenbrock_solve(rates, jacobian, k[b], conc, dt[b], 1e-3, 1e-6)
+        else:
+            conc = rk45_solve(rates, k[b], conc, dt[b])
+        for i in range(conc.shape[0]):
+            amount = conc[i] * volume[b]
+            new_n[b, i] = amount if amount > threshold else 0.0
+    return new_n
+
+# solvers which _react_batch can run
+_BATCH_METHODS = {'RK45': 0, 'newton': 1, 'rosenbrock': 2}
+# scipy solvers which make use of a jacobian
+_IMPLICIT_SOLVERS = {'Radau', 'BDF', 'LSODA'}
+
 
 class Reaction():
     def __init__(self,react_info: ReactInfo, solver: str = 'RK45', newton_steps: int = 100):
@@ -155,14 +504,18 @@ class Reaction():
             react_info (ReactInfo): Named Tuple containing all necessary reaction information
             solver (str): Which solver to use
             newton_steps (int): How many steps to use when the solver is 'newton'
+
+        Besides the scipy ``solve_ivp`` methods, the solver can be 'newton' (fast explicit steps) or 'rosenbrock'
+        (a compiled implicit solver for stiff reactions, see :func:`rosenbrock_solve`).
         """
         
-        if not solver in {'RK45', 'RK23', 'DOP853', 'DBF', 'LSODA','newton'}:
+        if not solver in {'RK45', 'RK23', 'DOP853', 'Radau', 'BDF', 'LSODA','newton','rosenbrock'}:
             solver='RK45'
         self.solver=solver
         self.newton_steps=newton_steps
         #has to be set somewhere
         self.threshold=1e-12
+        self.react_info = react_info
         
         #materials we need for the reaction
         self.reactants=react_info.REACTANTS
@@ -174,11 +527,46 @@ class Reaction():
         self.material_classes = tuple(material.REGISTRY[key] for key in self.materials)
         
         #Necessary for calculating rates
-        self.stoich_coeff_arr = react_info.stoich_coeff_arr
+        self.stoich_coeff_arr = np.ascontiguousarray(react_info.stoich_coeff_arr, dtype=np.float64)
         self.pre_exp_arr = react_info.pre_exp_arr
         self.activ_energy_arr = react_info.activ_energy_arr
-        self.conc_coeff_arr = react_info.conc_coeff_arr
+        self.conc_coeff_arr = np.ascontiguousarray(react_info.conc_coeff_arr, dtype=np.float64)
         self.num_reagents = len(self.reactants)
+        #Rate and jacobian functions generated for this reaction network
+        self.kernels = compile_reaction(react_info)
+        #Reaction constants of the most recently used temperatures
+        self.k_cache_size = 64
+        self._k_cache = OrderedDict()
+
+    def rate_constants(self, temp: float) -> np.array:
+        """
+        Args:
+            temp (float): The temperature in Kelvin.
+        Returns:
+            np.array: The reaction constants (see :func:`arrhenius`) at `temp`. These are cached by the exact
+            temperature since vessel temperatures usually stay the same over many steps (a vessel being heated
+            gets new constants every step).
+        """
+        key = float(temp)
+        cache = self._k_cache
+        k = cache.pop(key, None)
+        if k is None:
+            k = arrhenius(self.pre_exp_arr, self.activ_energy_arr, key)
+        #(re)inserting moves the key to the end so the least recently used temperature is evicted first
+        cache[key] = k
+        while len(cache) > self.k_cache_size:
+            cache.popitem(last=False)
+        return k
+
+    @property
+    def temp(self) -> float:
+        """The temperature used by :meth:`__call__` and :meth:`jacobian` (setting it looks up the reaction constants)"""
+        return self._temp
+
+    @temp.setter
+    def temp(self, temp: float):
+        self._temp = temp
+        self._k = self.rate_constants(temp)
 
     def update_concentrations(self,vessel: vessel.Vessel, dt: float = 0):
         """
@@ -220,9 +608,15 @@ class Reaction():
         
         if self.solver=='newton':
             #newton solver should be faster but less accurate
-            new_conc = newton_solve(self.stoich_coeff_arr, self.pre_exp_arr,
-                         self.activ_energy_arr, self.conc_coeff_arr,
-                         self.num_reagents, self.temp, conc, dt, self.newton_steps)
+            new_conc = newton_solve_k(self.kernels.reaction_rates, self._k, self.conc_coeff_arr,
+                         np.ascontiguousarray(conc, dtype=np.float64), dt, self.newton_steps)
+        elif self.solver=='rosenbrock':
+            new_conc = rosenbrock_solve(self.kernels.rates, self.kernels.jacobian, self._k,
+                         np.ascontiguousarray(conc, dtype=np.float64), dt, 1e-3, 1e-6)
+        elif self.solver in _IMPLICIT_SOLVERS:
+            #implicit solvers would otherwise estimate the jacobian with finite differences
+            #(a jac_sparsity pattern only speeds up that estimate for Radau and BDF, LSODA has no such option)
+            new_conc = solve_ivp(self, (0, dt), conc, method=self.solver, jac=self.jacobian).y[:, -1]
         else:
             new_conc = solve_ivp(self, (0, dt), conc, method=self.solver).y[:, -1]
         new_n = new_conc * volume
@@ -230,6 +624,70 @@ class Reaction():
         new_n *= (new_n > self.threshold)
         
         return new_n
+
+    def react_batch(self, n: np.array, temp: np.array, volume: np.array, dt: np.array):
+        """
+        Performs :meth:`react` on a batch of vessels at once. The 'newton', 'rosenbrock' and 'RK45' solvers run in a
+        single compiled kernel (parallel over vessels), the other scipy solvers fall back to one :meth:`react` call per
+        vessel. 'RK45' runs :func:`rk45_solve`, a port of scipy's RK45 which agrees with it up to round-off.
+        Vessels with (practically) nothing in them are left as is.
+
+        Args:
+            n (np.array): [N,M] array of the amounts of each material (in `materials` order) in each vessel.
+            temp (np.array): [N] array of vessel temperatures in Kelvin.
+            volume (np.array): [N] array of vessel volumes in Litres.
+            dt (np.array): [N] array of time-steps in seconds.
+        Returns:
+            np.array: [N,M] array of the new amounts of each material in each vessel
+        """
+        n = np.ascontiguousarray(n, dtype=np.float64).reshape(-1, len(self.materials))
+        shape = n.shape[:1]
+        temp = np.broadcast_to(np.asarray(temp, dtype=np.float64), shape)
+        volume = np.array(np.broadcast_to(np.asarray(volume, dtype=np.float64), shape))
+        dt = np.array(np.broadcast_to(np.asarray(dt, dtype=np.float64), shape))
+        if self.solver in _BATCH_METHODS:
+            k = np.array([self.rate_constants(t) for t in temp]).reshape(len(temp), -1)
+            return _react_batch(self.kernels.rates, self.kernels.jacobian, self.kernels.reaction_rates, k,
+                                self.conc_coeff_arr, n, volume, dt, _BATCH_METHODS[self.solver],
+                                self.newton_steps, self.threshold)
+        new_n = n.copy()
+        for b in range(n.shape[0]):
+            if n[b].sum() >= 1e-12:
+                new_n[b] = self.react(n[b], temp[b], volume[b], dt[b])
+        return new_n
+
+    def update_batch(self, vessels: Tuple[vessel.Vessel], dt: float = 0):
+        """
+        Same as calling :meth:`update_concentrations` on each vessel, but the reactions are integrated together using
+        :meth:`react_batch`.
+
+        Args:
+            vessels (Tuple[Vessel]): The vessels to perform the reaction on
+            dt (float): The amount of time passed during the reaction
+        """
+        if len(vessels) == 0:
+            return
+        n = np.array([_get_amounts(self.materials, v) for v in vessels])
+        temp = np.array([v.temperature for v in vessels], dtype=np.float64)
+        volume = np.array([v.filled_volume() for v in vessels], dtype=np.float64)
+        steps = np.array([dt if dt != 0 else v.default_dt for v in vessels], dtype=np.float64)
+        new_n = self.react_batch(n, temp, volume, steps)
+        for b, v in enumerate(vessels):
+            if n[b].sum() >= 1e-12:
+                _set_amounts(self.materials, self.solvents, self.material_classes, new_n[b], v)
+
+    def batchable_with(self, other) -> bool:
+        """
+        Returns:
+            bool: True if `other` is an identical reaction (so vessels using either can share a :meth:`update_batch` call)
+        """
+        if other is self:
+            return True
+        return (isinstance(other, Reaction) and other.solver == self.solver
+                and other.newton_steps == self.newton_steps and other.threshold == self.threshold
+                and other.materials == self.materials and other.num_reagents == self.num_reagents
+                and all(np.array_equal(getattr(self, key), getattr(other, key)) for key in
+                        ('stoich_coeff_arr', 'pre_exp_arr', 'activ_energy_arr', 'conc_coeff_arr')))
     
     def __call__(self, t, conc):
         """
@@ -237,9 +695,17 @@ class Reaction():
         remember to set the temperature before you call this function
         This function is mainly used with the scipy ODE solvers
         """
-        return get_rates(self.stoich_coeff_arr, self.pre_exp_arr,
-                         self.activ_energy_arr, self.conc_coeff_arr,
-                         self.num_reagents, self.temp, conc)
+        out = np.empty(len(conc))
+        self.kernels.rates(self._k, np.ascontiguousarray(conc, dtype=np.float64), out)
+        return out
+
+    def jacobian(self, t, conc):
+        """
+        The jacobian of :meth:`__call__` with respect to the concentrations (see :func:`get_jacobian`).
+        """
+        out = np.empty((len(conc), len(conc)))
+        self.kernels.jacobian(self._k, np.ascontiguousarray(conc, dtype=np.float64), out)
+        return out
     
     
 NoneType = type(None)
@@ -20,20 +20,19 @@ def get_dissolved_amounts(vessel: Vessel, desired_material: str):
             - The amount material that could be produced if you removed the solvent. This is the minimum of (quantity/stoich_coeff) for each dissolved component
             - The amount of mols of solutes to subtract from the total material amount
     """
-    material_amounts = []
-    dis_mats = material.REGISTRY[desired_material]().dissolve()
+    dis_mats = material.REGISTRY.dissolution(desired_material)
     # Dissolved version is already the target material
-    if len(dis_mats) < 2: return 0,0
+    if len(dis_mats.names) < 2: return 0,0
     min_amount=float("inf")
     n=0
-    for mat in dis_mats:
+    for key, coef in zip(dis_mats.names, dis_mats.coefficients.tolist()):
         #Can't make any with what's dissolved
-        if not mat._name in vessel.solute_dict: return 0,0
+        if not key in vessel.solute_dict: return 0,0
         # Determine how much of the target the solute would make
-        amount = vessel.material_dict[mat._name].mol / dis_mats[mat]
+        amount = vessel.material_dict[key].mol / coef
         if amount< min_amount:
             min_amount=amount
-        n+=dis_mats[mat]
+        n+=coef
 
     contributions=min_amount*(n-1)
     return min_amount,contributions
@@ -1,7 +1,10 @@
 from typing import NamedTuple, Tuple, Callable, Optional, List
+from collections.abc import MutableMapping
+import copy
 import numpy as np
 import numba
 import pandas as pd
+from chemistrylab import material
 from chemistrylab.extract_algorithms import separate#separate_cc as separate
 
 class Event(NamedTuple):
@@ -15,70 +18,418 @@ Event.parameter.__doc__ = "The parameters of the registered event function"
 Event.other_vessel.__doc__ = "The other vessel needed for this event if requred (ex the target vessel when pouring)."
 
 
-def _rebuild_solute_dict(solvent_dict, solute_dict, solvents):
-    """
-    Recreates the solute and solvent dict in the case where the solvents have changed.
-    Args:
-        solvent_dict (dict): The old solvent dict of (key,index) pairs
-        solute_dict (dict): The old solute dict of (key,arr) pairs
-        solvents (dict): The new list of solvents
-    Returns:
-        new_solvent_dict (dict): New set of (key,index) pairs
-        new_solute_dict (dict): New set of (key,arr) pairs
-    
-    Note: This can be called less frequently if you allow solvents with zero amount to persist
-    in the materials dict.
-    """
-    # needs to be called when adding or removing solvents (after you set the
-    # mols dissolved in any removed solvents to 0)
-    new_solvent_dict = {mat:i for i,mat in enumerate(solvents)}
-    new_solute_dict = \
-    {mat: np.array([solute_dict[mat][solvent_dict[sol]] if sol in solvent_dict else 0 
-        for sol in solvents], dtype=np.float32) 
-            for mat in solute_dict}
-    return new_solvent_dict, new_solute_dict
-
 @numba.jit(nopython=True)
-def _validate_solute_amounts(mol_solute, mol_solvent, mol_dissolved):
+def _validate_dissolved(mol, solute_mask, solvent_mol, dissolved):
     """
-    Performs a series of consistency checks on the mol_dissolved array.
+    Performs a series of consistency checks in place on a [slot, solvent] dissolved matrix where
+    only rows with solute_mask set are solutes.
 
     Args:
-        mol_solute (array): The total amount of each solute in the vessel (1D, size N)
-        mol_solvent (array): The total amount of each solvent in the vessel (1D, size M)
-        mol_dissolved (array) The amount of solute dissolved in each solvent (2D, shape [N,M])
-    
+        mol (array): The amount of each material (1D, size N)
+        solute_mask (array): Which materials are solutes (1D bool, size N)
+        solvent_mol (array): The amount of each solvent (1D, size M)
+        dissolved (array): The amount of each material dissolved in each solvent (2D, shape [>=N,M])
+
     Checks:
-    - Make sure the sum of each row in mol_dissolved is equal to the value in mol_solute
+    - Make sure the sum of each solute row in dissolved is equal to the value in mol
     - Strategies: Increase proportional to how much solvent there is
                       Decrease proportional to how much is already dissolved
-    - Make sure each column of mol_dissolved if the corresponding value in mol_solvent is 0
+    - Make sure each column of dissolved is 0 if the corresponding value in solvent_mol is 0
     - Strategies: Set columns to 0 before doing the sum check if there is no solvent
     """
-    # First make sure there are solvents
-    tot_solvent=mol_solvent.sum()
+    tot_solvent=solvent_mol.sum()
     if tot_solvent<1e-12:
-        mol_dissolved[:]=0
+        for i in range(mol.shape[0]):
+            if solute_mask[i]:
+                dissolved[i]=0
         return
-    #get normalized solvent amounts
-    norm_solvent=mol_solvent/tot_solvent
-    #Make sure there are no solutes in empty solvents
-    for j,v_mol in enumerate(mol_solvent):
-        if v_mol<1e-12:
-            mol_dissolved[:,j]=0
-    #make sure the sums consistent
-    for i,u_mol in enumerate(mol_solute):
-        checksum=mol_dissolved[i].sum()
-        #Set to zero if very close
+    norm_solvent=solvent_mol/tot_solvent
+    for j in range(solvent_mol.shape[0]):
+        if solvent_mol[j]<1e-12:
+            dissolved[:,j]=0
+    for i in range(mol.shape[0]):
+        if not solute_mask[i]:continue
+        u_mol=mol[i]
+        checksum=dissolved[i].sum()
         if u_mol<1e-16:
-            mol_dissolved[i]=0
-        #Decrease amounts proportional to what's in each solvent
+            dissolved[i]=0
         elif checksum>u_mol:
-            mol_dissolved[i] *= (u_mol/checksum)
-        #But increase amounts proportional to how much solvent there is
+            dissolved[i] *= (u_mol/checksum)
         elif checksum<u_mol:
-            mol_dissolved[i] += (u_mol-checksum)*norm_solvent
+            dissolved[i] += (u_mol-checksum)*norm_solvent
+
 
+@numba.jit(nopython=True, cache=True)
+def _layer_properties(volume, mol, phase, molar_mass, density, color, polarity, is_solute, is_solvent,
+        solvent_slots, solute_keys):
+    """
+    Gathers the inputs of separate.mix from the storage arrays of a vessel. The layers are made of the solvents
+    followed by every material that is not dissolved (solutes only form layers if there is no solvent),
+    with air filling the rest of the vessel.
+
+    Args:
+        volume (float): The volume of the vessel
+        mol, phase, molar_mass, density, color, polarity, is_solute, is_solvent (array): The slot arrays of the vessel
+        solvent_slots (array): The slot of each solvent in solvent_dict order
+        solute_keys (array): Which slots are in the solute dict
+
+    Returns:
+        Tuple[array]: The slot of each layer material, the volume, density and color of each layer (air last),
+        the polarity of each solvent and the polarity and volume per mol of each solute (0 for other slots)
+    """
+    n = mol.shape[0]
+    solvent_mol = 0.0
+    for j in solvent_slots:
+        solvent_mol += mol[j]
+    no_solvent = solvent_mol <= 1e-12
+    layer_slots = np.empty(n, dtype=np.int64)
+    k = 0
+    for j in solvent_slots:
+        layer_slots[k] = j
+        k += 1
+    for i in range(n):
+        if not is_solvent[i] and (no_solvent or not is_solute[i]):
+            layer_slots[k] = i
+            k += 1
+    layer_slots = layer_slots[:k]
+    layer_volume = np.empty(k+1, dtype=np.float32)
+    layer_density = np.empty(k+1, dtype=np.float32)
+    layer_colors = np.empty(k+1, dtype=np.float32)
+    filled = 0.0
+    for l in range(k):
+        i = layer_slots[l]
+        litres = 1e-3*mol[i]*molar_mass[i]/density[i, phase[i]]
+        filled += litres
+        layer_volume[l] = litres
+        layer_density[l] = density[i, phase[i]]*1000
+        layer_colors[l] = color[i]
+    # Air fills the rest of the vessel (density in g/L)
+    layer_volume[k] = volume - filled
+    layer_density[k] = 1.225
+    layer_colors[k] = 0.65
+    solvent_polarity = np.empty(solvent_slots.shape[0], dtype=np.float32)
+    for j in range(solvent_slots.shape[0]):
+        solvent_polarity[j] = polarity[solvent_slots[j]]
+    solute_polarity = np.zeros(n, dtype=np.float32)
+    solute_svolume = np.zeros(n, dtype=np.float32)
+    for i in range(n):
+        if solute_keys[i]:
+            solute_polarity[i] = polarity[i]
+            solute_svolume[i] = 1e-3*molar_mass[i]/density[i, phase[i]]
+    return layer_slots, layer_volume, layer_density, layer_colors, solvent_polarity, solute_polarity, solute_svolume
+
+
+@numba.jit(nopython=True, cache=True)
+def _commit_contents(mol, is_solute, is_solvent, solvent_slots, solute_keys, dissolved, validate, filled, volume):
+    """
+    Does the work of validate_solvents, validate_solutes and _handle_overflow in one pass over the
+    storage arrays of a vessel. Nothing is changed if the solvents or solutes no longer match the
+    solvent and solute dicts, since those have to be rebuilt in python.
+
+    Args:
+        mol (array): The amount of each material (1D, size N)
+        is_solute (array): Which materials are solutes (1D bool, size N)
+        is_solvent (array): Which materials are solvents (1D bool, size N)
+        solvent_slots (array): The slot of each solvent in solvent_dict order (1D int, size M)
+        solute_keys (array): Which materials are in the solute dict (1D bool, size N)
+        dissolved (array): The amount of each material dissolved in each solvent (2D, shape [N,>=M])
+        validate (bool): Whether to validate the dissolved amounts (False if the vessel ignores layout)
+        filled (float): The filled volume of the vessel (see Vessel.filled_volume)
+        volume (float): The volume of the vessel, or infinity to skip the overflow check
+
+    Returns:
+        int: 1 if the solvents or solutes changed, -1 if the vessel overflowed and 0 otherwise
+    """
+    n_solvents = solvent_slots.shape[0]
+    if validate:
+        if is_solvent.sum() != n_solvents:
+            return 1
+        for j in range(n_solvents):
+            if not is_solvent[solvent_slots[j]]:
+                return 1
+        if n_solvents > 0 and is_solute.any():
+            for i in range(mol.shape[0]):
+                if is_solute[i] != solute_keys[i]:
+                    return 1
+            _validate_dissolved(mol, is_solute, mol[solvent_slots], dissolved[:, :n_solvents])
+    if filled > volume:
+        ratio = volume/filled
+        mol *= ratio
+        for i in range(dissolved.shape[0]):
+            for j in range(dissolved.shape[1]):
+                dissolved[i, j] *= ratio
+        return -1
+    return 0
+
+
+@numba.jit(nopython=True, cache=True)
+def _aggregates(mol, phase, molar_mass, specific_heat, density):
+    """
+    Sums up the volume and heat capacity of the materials in a vessel
+    (in the same order as summing Material.litres and Material.heat_capacity).
+
+    Args:
+        mol (array): The amount of each material (1D, size N)
+        phase (array): The phase code of each material (1D, size N)
+        molar_mass (array): The molar mass of each material (1D, size N)
+        specific_heat (array): The specific heat of each material (1D, size N)
+        density (array): The density of each material in each phase (2D, shape [N,4])
+
+    Returns:
+        Tuple[float,float]: The filled volume (in litres) and the heat capacity of the materials (in J/K)
+    """
+    litres = 0.0
+    for i in range(mol.shape[0]):
+        litres += 1e-3*mol[i]*molar_mass[i]/density[i, phase[i]]
+    return litres, _material_heat(mol, molar_mass, specific_heat)
+
+
+@numba.jit(nopython=True, cache=True)
+def _boil_off(T0, Tf, ht, use_dQ, air_heat, mol, order, molar_mass, specific_heat, boiling_point, enthalpy_vapor, boiled):
+    """
+    Heats up a vessel, boiling off materials in order of boiling point (see Vessel._heat_contact).
+
+    Args:
+        T0 (float): The temperature of the vessel
+        Tf (float): The temperature of the heat source (when use_dQ is set it should be T0+1)
+        ht (float): heat transfer coeff multiplied by how long you have (or heat when use_dQ is set)
+        use_dQ (bool): Whether to linearly approximate exp and log (see Vessel._heat_contact)
+        air_heat (float): The heat capacity of the air in the vessel
+        mol (array): The amount of each material (1D, size N), boiled material is removed in place
+        order (array): Indices of the materials sorted by boiling point
+        molar_mass, specific_heat, boiling_point, enthalpy_vapor (array): Material properties (1D, size N)
+        boiled (array): Output for the amount of each material which boiled off (1D, size N)
+
+    Returns:
+        Tuple[float,int]: The final temperature and how many materials (from the front of order) started boiling
+    """
+    T = T0
+    x = -ht/(air_heat+_material_heat(mol, molar_mass, specific_heat))
+    T_est = Tf+(T-Tf)*((1+x) if use_dQ else np.exp(x))
+    i = 0
+    while i < order.shape[0]:
+        c = order[i]
+        boil = boiling_point[c]
+        if not (T_est > boil and T_est > T):
+            break
+        #amount of transfer-time required to reach boiling temperature
+        r = (Tf-boil)/(Tf-T)
+        ht += ((r-1) if use_dQ else np.log(r))*(air_heat+_material_heat(mol, molar_mass, specific_heat))
+        T = boil
+        if use_dQ: Tf = T+1
+        boil_enthalpy = mol[c]*enthalpy_vapor[c]
+        ht_used = min(ht, boil_enthalpy/(Tf-boil))
+        ht -= ht_used
+        fraction = (ht_used*(Tf-boil)/boil_enthalpy) if ht_used > 0 else 0.0
+        boiled[c] = mol[c]*fraction
+        mol[c] -= boiled[c]
+        #Heat capacity is recomputed since it should be lower now
+        x = -ht/(air_heat+_material_heat(mol, molar_mass, specific_heat))
+        T_est = Tf+(T-Tf)*((1+x) if use_dQ else np.exp(x))
+        i += 1
+    return T_est, i
+
+
+@numba.jit(nopython=True, cache=True)
+def _material_heat(mol, molar_mass, specific_heat):
+    """Returns the heat capacity of the materials (not counting air) in J/K"""
+    heat = 0.0
+    for i in range(mol.shape[0]):
+        heat += mol[i]*molar_mass[i]*specific_heat[i]
+    return heat
+
+
+@numba.jit(nopython=True, cache=True)
+def _match_species(species, other_species):
+    """
+    Returns:
+        array: The slot holding each species of `species` in `other_species` (-1 if it is missing)
+    """
+    slots = np.full(species.shape[0], -1, dtype=np.int64)
+    for i in range(species.shape[0]):
+        for j in range(other_species.shape[0]):
+            if species[i] == other_species[j]:
+                slots[i] = j
+                break
+    return slots
+
+
+@numba.jit(nopython=True, cache=True)
+def _transfer(fraction, mol, dissolved, slots, other_mol):
+    """
+    Moves `fraction` of each material into slot slots[i] of another vessel (see Vessel._pour_by_percent).
+
+    Args:
+        fraction (float): The fraction of the contents to move
+        mol (array): The amount of each material (1D, size N)
+        dissolved (array): The amount of each material dissolved in each solvent (2D, shape [N,M])
+        slots (array): The slot of each material in the other vessel (1D, size N)
+        other_mol (array): The amount of each material in the other vessel
+    """
+    for i in range(mol.shape[0]):
+        other_mol[slots[i]] += mol[i]*fraction
+        mol[i] *= (1-fraction)
+    # Rows of materials which are not solutes are empty
+    for i in range(dissolved.shape[0]):
+        for j in range(dissolved.shape[1]):
+            dissolved[i, j] *= (1-fraction)
+
+
+@numba.jit(nopython=True, cache=True)
+def _drain(drained_layers, tot_pixels, layers_volume, solvent_layers, solvent_slots, solute_mask, mol, dissolved,
+           drained, moved):
+    """
+    Takes the solvents in the drained pixels, along with the solutes dissolved in them, out of a vessel
+    (see Vessel._drain_by_pixel).
+
+    Args:
+        drained_layers (array): The layer index of each drained pixel (1D)
+        tot_pixels (int): The number of pixels in the vessel
+        layers_volume (array): The volume of each layer
+        solvent_layers (array): The layer index of each solvent (1D, size M)
+        solvent_slots (array): The slot of each solvent (1D, size M)
+        solute_mask (array): Which materials are solutes (1D bool, size N)
+        mol (array): The amount of each material (1D, size N)
+        dissolved (array): The amount of each material dissolved in each solvent (2D, shape [N,M])
+        drained (array): Output for the amount of each material drained (1D, size N)
+        moved (array): Output for the order in which materials were first drained, starting at 1 (0 for materials
+            which should not be added to the receiving vessel) (1D int, size N)
+    """
+    n_layers = 1
+    for k in range(solvent_layers.shape[0]):
+        n_layers = max(n_layers, solvent_layers[k]+1)
+    counts = np.bincount(drained_layers, minlength=n_layers)
+    n_moved = 0
+    for k in range(solvent_layers.shape[0]):
+        drained_volume = counts[solvent_layers[k]]/tot_pixels
+        if drained_volume <= 1e-12: continue
+        #how much solvent is drained (percent wise)
+        fraction = min(max(drained_volume/layers_volume[solvent_layers[k]], 0.0), 1.0)
+        c = solvent_slots[k]
+        d_mol = mol[c]*fraction
+        drained[c] += d_mol
+        mol[c] -= d_mol
+        if moved[c] == 0:
+            n_moved += 1
+            moved[c] = n_moved
+        #drain the solutes dissolved in it
+        for u in range(mol.shape[0]):
+            if not solute_mask[u]: continue
+            removed = fraction*dissolved[u, k]
+            dissolved[u, k] -= removed
+            if removed <= 1e-12: continue
+            drained[u] += removed
+            mol[u] -= removed
+            if moved[u] == 0:
+                n_moved += 1
+                moved[u] = n_moved
+
+
+class MaterialDict(dict):
+    """
+    A dict of (name, Material) pairs where the amount and phase of each Material are stored
+    in the arrays of the vessel owning the dict. Slot i of these arrays always belongs to the
+    i-th material in the dict.
+
+    Note: A Material can only be stored in one vessel at a time.
+    """
+    def __init__(self, vessel, materials=()):
+        super().__init__()
+        self._vessel = vessel
+        self.update(materials)
+
+    def __setitem__(self, key, mat):
+        # _vessel is missing while unpickling and already set on deepcopied materials
+        vessel = getattr(self, "_vessel", None)
+        if vessel is not None and mat._vessel is not vessel:
+            vessel._bind(key, mat)
+        dict.__setitem__(self, key, mat)
+
+    def __delitem__(self, key):
+        self[key]._unbind()
+        dict.__delitem__(self, key)
+        self._vessel._compact_slots()
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, "items") else other
+        for key, mat in items:
+            self[key] = mat
+        for key, mat in kwargs.items():
+            self[key] = mat
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, mat=None):
+        if key not in self:
+            self[key] = mat
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        mat = self[key]
+        del self[key]
+        return mat
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        for mat in self.values():
+            mat._unbind()
+        dict.clear(self)
+        self._vessel._compact_slots()
+
+
+class SoluteDict(MutableMapping):
+    """
+    A view of the dissolved amount matrix of a vessel as (name, array) pairs, where each array
+    holds the amount of a solute dissolved in each solvent (see Vessel.solvent_dict).
+    Arrays given out by the view are writable views of the matrix.
+    """
+    def __init__(self, vessel):
+        self._vessel = vessel
+        self._keys = dict()
+
+    def __getitem__(self, key):
+        if not key in self._keys:
+            raise KeyError(key)
+        v = self._vessel
+        return v._dissolved[v.material_dict[key]._slot, :len(v.solvent_dict)]
+
+    def __setitem__(self, key, arr):
+        v = self._vessel
+        v._grow(0, len(v.solvent_dict))
+        v._dissolved[v.material_dict[key]._slot, :len(v.solvent_dict)] = arr
+        if key not in self._keys:
+            self._keys[key] = None
+            v._structure = None
+
+    def __delitem__(self, key):
+        v = self._vessel
+        v._dissolved[v.material_dict[key]._slot] = 0
+        del self._keys[key]
+        v._structure = None
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+# Layer arrays saved along with the vessel contents by _state_views
+_STATE_ARRAYS = ("_layers_position", "_layers_variance", "_layer_volumes", "_layers_volume", "_lvar",
+    "_layer_colors", "_layers", "_hashed_layers")
 
 layer_values=np.linspace(0, 1, 100, endpoint=True, dtype=np.float32)-1.9e-2
 
@@ -114,6 +465,17 @@ class Vessel:
     |  heat contact    | Connect the vessel to a reservoir for heat transfer | Tf (float), ht (float)                  |
     +------------------+-----------------------------------------------------+-----------------------------------------+
 
+    Vessel contents are stored as a struct of arrays, with one slot per material:
+
+    - `_species` holds the species id of each material (see :data:`chemistrylab.material.SPECIES_INDEX`)
+    - `_mol` holds the amount of each material (in mol)
+    - `_phase` holds the phase code of each material (see :data:`chemistrylab.material.PHASES`)
+    - `_polarity` holds the polarity of each material
+    - `_dissolved` is a [slot, solvent] matrix of how much of each material is dissolved in each solvent
+    - `_molar_mass`, `_specific_heat`, `_density` (one column per phase), `_color`, `_is_solute` and `_is_solvent`
+      copy the material properties used to work out :meth:`filled_volume`, :meth:`heat_capacity` and the layers
+
+    `material_dict` and `solute_dict` are views of these arrays so Material objects can still be used directly.
     """
 
     def __init__(
@@ -134,8 +496,23 @@ class Vessel:
         self.default_dt=0.01
         self.temperature=temperature
         self.volume=volume
-        self.material_dict=dict() # String keys, Material values
-        self.solute_dict=dict() # String Keys, float array values
+        #Array storage for the vessel contents (see _bind)
+        self._species = np.full(4, -1, dtype=np.int32)
+        self._mol = np.zeros(4, dtype=np.float64)
+        self._phase = np.zeros(4, dtype=np.int8)
+        self._dissolved = np.zeros([4, 4], dtype=np.float32)
+        self._molar_mass = np.zeros(4, dtype=np.float64)
+        self._specific_heat = np.zeros(4, dtype=np.float64)
+        self._density = np.ones([4, len(material.PHASES)], dtype=np.float64)
+        self._color = np.zeros(4, dtype=np.float64)
+        self._polarity = np.zeros(4, dtype=np.float64)
+        self._is_solute = np.zeros(4, dtype=np.bool_)
+        self._is_solvent = np.zeros(4, dtype=np.bool_)
+        self._aggregates = None
+        self._structure = None
+        self._boil_order = None
+        self._material_dict = MaterialDict(self) # String keys, Material values
+        self._solute_dict = SoluteDict(self) # String Keys, float array values
         self.solvent_dict=dict() #String Keys, index values
         self.solvents=[]
         self._layers_position = np.zeros(1, dtype=np.float32)
@@ -145,37 +522,214 @@ class Vessel:
         self._layers = None
         self.ignore_layout=ignore_layout
         self._layer_mats=[]
+        #Change tracking (see push_event_to_queue)
+        self._version = 0
+        self._settled = None
+        self._mix_settled = False
 
     def __repr__(self):
         return self.label
 
+    @property
+    def material_dict(self):
+        """MaterialDict: The materials in the vessel as (name, Material) pairs"""
+        return self._material_dict
+
+    @material_dict.setter
+    def material_dict(self, materials):
+        self._material_dict.clear()
+        self._material_dict.update(materials)
+
+    @property
+    def solute_dict(self):
+        """SoluteDict: How much of each solute is dissolved in each solvent as (name, array) pairs"""
+        return self._solute_dict
+
+    @solute_dict.setter
+    def solute_dict(self, solutes):
+        # solutes may be a view of the matrix we are about to write to
+        solutes = {key:np.array(arr) for key,arr in solutes.items()}
+        self._solute_dict.clear()
+        self._grow(len(self._mol), max((len(arr) for arr in solutes.values()), default=0))
+        for key,arr in solutes.items():
+            self._solute_dict[key] = arr
+
+    def _grow(self, n_slots, n_solvents):
+        """Makes sure the storage arrays have room for n_slots materials and n_solvents solvents"""
+        cap, scap = self._dissolved.shape
+        if n_slots <= cap and n_solvents <= scap:
+            return
+        new_cap, new_scap = max(cap, 1), max(scap, 1)
+        while new_cap < n_slots: new_cap *= 2
+        while new_scap < n_solvents: new_scap *= 2
+        dissolved = np.zeros([new_cap, new_scap], dtype=np.float32)
+        dissolved[:cap, :scap] = self._dissolved
+        self._dissolved = dissolved
+        if new_cap > cap:
+            self._species = np.concatenate([self._species, np.full(new_cap-cap, -1, dtype=np.int32)])
+            self._mol = np.concatenate([self._mol, np.zeros(new_cap-cap)])
+            self._phase = np.concatenate([self._phase, np.zeros(new_cap-cap, dtype=np.int8)])
+            self._molar_mass = np.concatenate([self._molar_mass, np.zeros(new_cap-cap)])
+            self._specific_heat = np.concatenate([self._specific_heat, np.zeros(new_cap-cap)])
+            self._density = np.concatenate([self._density, np.ones([new_cap-cap, len(material.PHASES)])])
+            self._color = np.concatenate([self._color, np.zeros(new_cap-cap)])
+            self._polarity = np.concatenate([self._polarity, np.zeros(new_cap-cap)])
+            self._is_solute = np.concatenate([self._is_solute, np.zeros(new_cap-cap, dtype=np.bool_)])
+            self._is_solvent = np.concatenate([self._is_solvent, np.zeros(new_cap-cap, dtype=np.bool_)])
+
+    def _bind(self, key, mat):
+        """
+        Gives a material a slot in the storage arrays, moving its mol and phase into them.
+        If the key is already in use, the slot of the old material is reused.
+        """
+        mol, phase, polarity = mat.mol, mat.phase_code, mat.polarity
+        if mat._vessel is not None:
+            mat._unbind()
+        old = self._material_dict.get(key)
+        if old is not None:
+            slot = old._slot
+            old._unbind()
+        else:
+            slot = len(self._material_dict)
+            self._grow(slot+1, 0)
+            self._dissolved[slot] = 0
+        self._species[slot] = material.get_species_id(key)
+        mat._vessel, mat._slot = self, slot
+        self._mol[slot] = mol
+        self._phase[slot] = phase
+        self._polarity[slot] = polarity
+        self._is_solute[slot], self._is_solvent[slot] = mat._solute, mat._solvent
+        self._sync_record(mat)
+        self._structure = None
+
+    def _sync_record(self, mat):
+        """
+        Copies the species properties of a material into its slot (see Material._record), this is called
+        whenever one of them is set on a material in this vessel.
+        """
+        slot = mat._slot
+        self._molar_mass[slot] = mat._molar_mass
+        self._specific_heat[slot] = np.nan if mat._specific_heat is None else mat._specific_heat
+        self._density[slot] = [np.nan if d is None else d for d in mat._record.density]
+        self._color[slot] = mat._color
+        self._aggregates = self._boil_order = self._settled = None
+
+    def _compact_slots(self):
+        """Moves slots back in line with the material dict order after materials are removed."""
+        slots = np.array([mat._slot for mat in self._material_dict.values()], dtype=np.int64)
+        n = len(slots)
+        self._species[:n], self._mol[:n], self._phase[:n] = self._species[slots], self._mol[slots], self._phase[slots]
+        self._dissolved[:n] = self._dissolved[slots]
+        self._molar_mass[:n], self._specific_heat[:n] = self._molar_mass[slots], self._specific_heat[slots]
+        self._density[:n] = self._density[slots]
+        self._color[:n], self._polarity[:n] = self._color[slots], self._polarity[slots]
+        self._is_solute[:n], self._is_solvent[:n] = self._is_solute[slots], self._is_solvent[slots]
+        self._aggregates = self._boil_order = self._structure = None
+        self._species[n:], self._mol[n:], self._phase[n:], self._dissolved[n:] = -1, 0, 0, 0
+        self._is_solute[n:], self._is_solvent[n:] = False, False
+        for i,mat in enumerate(self._material_dict.values()):
+            mat._slot = i
+        for key in [key for key in self._solute_dict if key not in self._material_dict]:
+            self._solute_dict._keys.pop(key)
+
+    def _state_layout(self):
+        """
+        Returns:
+            tuple: A hashable description of the vessel structure (materials, solutes, solvents and the
+            shapes of the layer arrays). Two states with the same layout can be copied into each other.
+        """
+        arrays = tuple(None if getattr(self, a, None) is None else (getattr(self, a).shape, getattr(self, a).dtype.str)
+            for a in _STATE_ARRAYS)
+        return (tuple(self.material_dict), tuple(self.solute_dict), tuple(self.solvents), arrays)
+
+    def _state_views(self):
+        """Returns writable views of every array saved by a vessel state, in a fixed order."""
+        n, ns = len(self.material_dict), len(self.solvent_dict)
+        views = [self._mol[:n], self._phase[:n], self._dissolved[:n, :ns]]
+        return views + [getattr(self, a) for a in _STATE_ARRAYS if getattr(self, a, None) is not None]
+
+    def _same_materials(self, materials):
+        """
+        Returns:
+            bool: True if the vessel materials have the same types, species records, solute/solvent flags
+            and polarities as `materials` (in order)
+        """
+        return len(materials) == len(self.material_dict) and all(type(a) is type(b) and a._record is b._record
+            and a._solute == b._solute and a._solvent == b._solvent and a.polarity == b.polarity
+            for a,b in zip(self.material_dict.values(), materials))
+
+    def _set_layout(self, layout, materials):
+        """
+        Rebuilds the structure of the vessel so it matches `layout`, allocating (uninitialized) layer arrays.
+        The materials are only rebuilt if the materials (see _same_materials), solutes or solvents differ.
+
+        Args:
+            layout (tuple): A layout given by _state_layout
+            materials (Tuple[Material]): The Material objects of the vessel when the layout was taken
+        """
+        keys, solutes, solvents, arrays = layout
+        if (keys, solutes, solvents) != self._state_layout()[:3] or not self._same_materials(materials):
+            # Materials bound to another vessel are copied rather than taken from it
+            materials = [m if m._vessel in (None, self) else copy.copy(m) for m in materials]
+            self.material_dict = dict(zip(keys, materials))
+            self._grow(len(keys), len(solvents))
+            self._solute_dict._keys = dict.fromkeys(solutes)
+            self.solvents = solvents
+            self.solvent_dict = {key:i for i,key in enumerate(solvents)}
+            self._structure = None
+        for attr, arr in zip(_STATE_ARRAYS, arrays):
+            old = getattr(self, attr, None)
+            if arr is None or old is None or (old.shape, old.dtype.str) != arr:
+                setattr(self, attr, None if arr is None else np.empty(*arr))
+
+    def _load_template(self, template):
+        """
+        Overwrites this vessel with the contents of `template`. The arrays are copied in place
+        if both vessels have the same structure.
+
+        Args:
+            template (Vessel): The vessel to copy
+        """
+        layout = template._state_layout()
+        if self._state_layout() != layout:
+            self._set_layout(layout, tuple(template.material_dict.values()))
+        for a,b in zip(self._state_views(), template._state_views()):
+            a[...] = b
+        self._aggregates = None
+        self.label, self.default_dt, self.ignore_layout = template.label, template.default_dt, template.ignore_layout
+        self.temperature, self.volume, self._variance = template.temperature, template.volume, template._variance
+        self._layer_mats = [self.material_dict.get(mat._name, mat) for mat in template._layer_mats]
+        self._settled = None
+
     def validate_solutes(self, checksum: bool = True):
         """
-        Turns the solute dict into a 2D array, gets a 1D array
-        of solute amounts, as well as a 1D array of solvent amounts, then
-        performs consistency checks with _validate_solute_amounts.
+        Updates which materials are solutes, then performs consistency checks (see _validate_dissolved)
+        on the dissolved amount matrix in place.
         """
         if self.ignore_layout:return
         n_solvents=len(self.solvents)
-        #gather a list of solutes
-        solutes = tuple(a for a in self.material_dict if self.material_dict[a].is_solute())
-        if n_solvents==0 or len(solutes)==0:return
-        #get mol information for solutes and solvents
-        solute_mols = np.array([self.material_dict[key].mol for key in solutes])
-        solvent_mols = np.array([self.material_dict[key].mol for key in self.solvents])
-
-        #get all of the dissolved amounts
-        null = np.zeros(n_solvents)
-        old_dict=self.solute_dict
-        mol_dissolved=np.stack([old_dict[key] if key in old_dict else null for key in solutes])
-        #run the validation
-        _validate_solute_amounts(solute_mols, solvent_mols, mol_dissolved)
-        #set the new solute dict
-        self.solute_dict={key:mol_dissolved[i] for i,key in enumerate(solutes)}
+        mdict = self.material_dict
+        n = len(mdict)
+        solute_mask = self._is_solute[:n]
+        if n_solvents==0 or not solute_mask.any():return
+        solutes = tuple(key for key,flag in zip(mdict, solute_mask) if flag)
+        keys = self._solute_dict._keys
+        if tuple(keys) != solutes:
+            # Solutes start out with nothing dissolved and stop being tracked if they are no longer solutes
+            for key in solutes:
+                if key not in keys:
+                    self._dissolved[mdict[key]._slot] = 0
+            for key in keys:
+                if key not in mdict or not mdict[key].is_solute():
+                    if key in mdict: self._dissolved[mdict[key]._slot] = 0
+            self._solute_dict._keys = dict.fromkeys(solutes)
+            self._structure = None
+        solvent_mols = np.array([mdict[key].mol for key in self.solvents])
+        _validate_dissolved(self._mol[:n], solute_mask, solvent_mols, self._dissolved[:n, :n_solvents])
 
     def validate_solvents(self):
         """
-        Updates the solute_dict and solvent_dict / solvent array when the solvents have changed
+        Updates the dissolved amount matrix and solvent_dict / solvent array when the solvents have changed
         
         """
         if self.ignore_layout:return
@@ -183,27 +737,42 @@ class Vessel:
         #union should be the same length as both new_solvents and solvents
         union = tuple(a for a in new_solvents if a in self.solvent_dict)
         if len(new_solvents)!=len(self.solvents) or len(new_solvents)!= len(union) :
-
-            #copy over variances
-            self._layers_variance = np.array([self._layers_variance[self.solvent_dict[sol]]
-            if sol in self.solvent_dict else 0 for sol in new_solvents]+[self._layers_variance[-1]],
-            dtype = np.float32)
-            #copy over amounts
-            self._layer_volumes = np.array([self._layer_volumes[self.solvent_dict[sol]]
-            if sol in self.solvent_dict else 0 for sol in new_solvents]+[self._layer_volumes[-1]],
-            dtype = np.float32)
-            #make a new solvent dict
-            self.solvent_dict,self.solute_dict = _rebuild_solute_dict(
-                self.solvent_dict, self.solute_dict, new_solvents
-            )
+            n_old, n_solvents = len(self.solvents), len(new_solvents)
+            self._grow(0, n_solvents)
+            if new_solvents[:n_old] == tuple(self.solvents):
+                # New solvents were added after the old ones, so they just take the next (spare) columns.
+                # Solvents are never removed from the vessel (emptied ones stay as zero-amount materials)
+                # so this is the usual case.
+                new = np.zeros(n_solvents-n_old, dtype=np.float32)
+                self._layers_variance = np.concatenate([self._layers_variance[:n_old], new, self._layers_variance[-1:]])
+                self._layer_volumes = np.concatenate([self._layer_volumes[:n_old], new, self._layer_volumes[-1:]])
+                self._dissolved[:, n_old:n_solvents] = 0
+                self.solvent_dict.update((sol,i) for i,sol in enumerate(new_solvents[n_old:], n_old))
+            else:
+                #copy over variances
+                self._layers_variance = np.array([self._layers_variance[self.solvent_dict[sol]]
+                if sol in self.solvent_dict else 0 for sol in new_solvents]+[self._layers_variance[-1]],
+                dtype = np.float32)
+                #copy over amounts
+                self._layer_volumes = np.array([self._layer_volumes[self.solvent_dict[sol]]
+                if sol in self.solvent_dict else 0 for sol in new_solvents]+[self._layer_volumes[-1]],
+                dtype = np.float32)
+                #move the dissolved amounts into the columns of the new solvents
+                cols = [self.solvent_dict.get(sol, -1) for sol in new_solvents]
+                old = self._dissolved.copy()
+                self._dissolved[:] = 0
+                for j,col in enumerate(cols):
+                    if col >= 0:
+                        self._dissolved[:, j] = old[:, col]
+                self.solvent_dict = {mat:i for i,mat in enumerate(new_solvents)}
             
-            n_solvents=len(new_solvents)
             # If we went from 0 to 1+ solvents we need to dissolve the solutes
             if len(self.solvents)==0 and n_solvents:
                 for key,arr in self.solute_dict.items():
                     arr+=self.material_dict[key].mol/n_solvents
                 
             self.solvents=new_solvents
+            self._structure = None
             #last entry is for air
             self._layers_position = np.zeros(n_solvents+1, dtype=np.float32)
 
@@ -216,13 +785,52 @@ class Vessel:
         # decrease everything proportionally  and return -1 if there is an overflow
         if filled>self.volume:
             ratio = self.volume/filled
-            for key,mat in self.material_dict.items():
-                mat.mol*=ratio
-            for key,arr in self.solute_dict.items():
-                arr*=ratio
+            n = len(self.material_dict)
+            self._mol[:n] *= ratio
+            self._dissolved[:n] *= ratio
+            self._aggregates = None
             return -1
         return 0
 
+    def _get_structure(self):
+        """
+        Returns the slots of the solvents (in solvent_dict order) and a mask of the slots in the solute dict.
+        These are cached until the materials, solvents or solutes change.
+        """
+        cache = self._structure
+        if cache is None or cache[0] is not self.solvents:
+            mdict = self.material_dict
+            solute_keys = np.zeros(len(mdict), dtype=np.bool_)
+            for key in self._solute_dict:
+                solute_keys[mdict[key]._slot] = True
+            solvent_slots = np.array([mdict[key]._slot for key in self.solvents], dtype=np.int64)
+            cache = self._structure = (self.solvents, solvent_slots, solute_keys)
+        return cache[1], cache[2]
+
+    def _commit(self, overflow: bool = True) -> int:
+        """
+        Runs validate_solvents, validate_solutes and _handle_overflow at the end of an event. Unless the
+        solvents or solutes changed, this is a single compiled pass (see _commit_contents).
+
+        Args:
+            overflow (bool): Whether to check for overflow
+
+        Returns:
+            int: -1 if the vessel overflowed, 0 otherwise
+        """
+        n = len(self.material_dict)
+        solvent_slots, solute_keys = self._get_structure()
+        filled, volume = (self.filled_volume(), self.volume) if overflow else (0.0, np.inf)
+        status = _commit_contents(self._mol[:n], self._is_solute[:n], self._is_solvent[:n], solvent_slots, solute_keys,
+            self._dissolved[:n], not self.ignore_layout, filled, volume)
+        if status == 1:
+            self.validate_solvents()
+            self.validate_solutes()
+            return self._handle_overflow() if overflow else 0
+        if status == -1:
+            self._aggregates = None
+        return status
+
     def heat_capacity(self):
         """
         Returns:
@@ -230,14 +838,25 @@ class Vessel:
         """
         C_air = 1.2292875 #Heat capacity of air in J/L*K (near STP)
         #Adding in an approximate heat capacity for the air
-        return self.volume*C_air+sum(mat.heat_capacity for a,mat in self.material_dict.items())
+        return self.volume*C_air+self._get_aggregates()[1]
 
     def filled_volume(self):
         """
         Returns:
             float: The volume of all non-gas phase materials in the vessel (in Litres).
         """
-        return sum(mat.litres for a,mat in self.material_dict.items())
+        return self._get_aggregates()[0]
+
+    def _get_aggregates(self):
+        """
+        Returns the filled volume and the heat capacity of the materials in the vessel. These are
+        cached until an amount or phase changes (see Material.mol).
+        """
+        if self._aggregates is None:
+            n = len(self.material_dict)
+            self._aggregates = _aggregates(self._mol[:n], self._phase[:n], self._molar_mass[:n], 
+                self._specific_heat[:n], self._density[:n])
+        return self._aggregates
 
     def get_material_dataframe(self):
         """
@@ -253,7 +872,7 @@ class Vessel:
         Returns:
             :class:`~pandas.DataFrame`: A [solutes, solvents] DataFrame detailing how much solute is dissolved in each solvent.  
         """
-        return pd.DataFrame.from_dict(self.solute_dict, orient="index",columns = self.solvents)
+        return pd.DataFrame.from_dict(dict(self.solute_dict.items()), orient="index",columns = self.solvents)
 
     def get_layer_dataframe(self):
         """
@@ -295,12 +914,42 @@ class Vessel:
         event_dict = type(self)._event_dict
         status=[]
         for event in events:
+            self._version += 1
+            if event.other_vessel is not None:
+                event.other_vessel._version += 1
             status.append(event_dict[event.name](self, dt, event.other_vessel, *event.parameter))
         if (not self.ignore_layout) and update_layers:
-            self._mix(0,None,dt)
-            self._update_layers(0,None)
+            if dt >= 0 and self._is_settled(dt):
+                # Letting a settled vessel sit only advances the solute mixing time
+                self._variance = separate.advance_solute_time(np.float32(self._variance), np.float32(dt))
+            else:
+                self._mix(0,None,dt)
+                self._update_layers(0,None)
+                n = len(self.material_dict)
+                self._settled = ((self._version, self.volume, self._mol[:n].copy(), self._phase[:n].copy(), dt)
+                    if self._mix_settled else None)
         return status
 
+    def _is_settled(self, dt):
+        """
+        Args:
+            dt (float): The mixing time about to be used
+
+        Returns:
+            bool: True if the last mix (for the same time dt) left the layers and solutes unchanged, and no event,
+            amount or volume has changed since. Mixing such a vessel for dt again has the same inputs apart from
+            the solute variance (which only moves solutes if there are two solvents), so the layers can be reused.
+            A different dt could still move the layers, so it does not count as settled.
+            Reusing the layer image also skips the random numbers map_to_state would have drawn from numba's RNG,
+            so layer images of seeded runs differ from those of versions without this shortcut.
+        """
+        if getattr(self, "_settled", None) is None:
+            return False
+        version, volume, mol, phase, settled_dt = self._settled
+        n = len(self.material_dict)
+        return (version == self._version and volume == self.volume and settled_dt == dt and
+            np.array_equal(mol, self._mol[:n]) and np.array_equal(phase, self._phase[:n]))
+
     def _heat_contact(self, dt, other_vessel, Tf, ht) -> int:
         """
         Rough Estimate of heat transfer so we can simulate putting something on a bunson burner
@@ -325,62 +974,59 @@ class Vessel:
         if use_dQ:
             # Adding heat (dQ) is the same as linearly approximating the exponential and log functions and setting
             # The reservoir temperature to one unit above the current temperature (trust me)
-            exp= lambda x:1+x
-            ln = lambda x:x-1
             Tf = self.temperature+1
-        else:
-            ln=np.log
-            exp=np.exp
-
-
-        other_mats=other_vessel.material_dict
-        # Estimated final temperature before taking boiling into account
-        T = Tf+(self.temperature-Tf)*exp(-ht/self.heat_capacity())
 
         mdict=self.material_dict
+        n = len(mdict)
         #case for changing the heat of an empty vessel
-        total_mats = sum(mat.mol for key,mat in mdict.items())
+        total_mats = self._mol[:n].sum()
         if total_mats<1e-12:
-            self.temperature = T
+            x = -ht/self.heat_capacity()
+            self.temperature = Tf+(self.temperature-Tf)*((1+x) if use_dQ else np.exp(x))
             # -1 if placing an empty beaker on something hot
             return 0 if Tf<373 else -1
-        #get sorted boiling points
-        bp = sorted([(key,mdict[key]._boiling_point) for key in mdict],key = lambda x:x[1])
-
-        key,boil=bp[0]
-        i=0
-        while T>boil and T>self.temperature:
-            material = mdict[key]
-            #amount of transfer-time required to reach boiling temperature
-            ht += ln((Tf-boil)/(Tf-self.temperature))*self.heat_capacity() #i
-            self.temperature = boil #i
-            if use_dQ: Tf = self.temperature+1
-            boil_enthalpy=material.vapour_enthalpy #ii
-            # ht = dQ/(T_f-T_boil)
-            ht_used=min(ht,boil_enthalpy/(Tf-boil)) #ii
-            ht-=ht_used #iii
-            # Move the boiled material (iii)
-            fraction = (ht_used*(Tf-boil)/boil_enthalpy) if ht_used > 0 else 0
-            if key in other_mats:
-                d_mol = material.mol*fraction
-                other_mats[key].mol += d_mol
-                material.mol -= d_mol
-            else:
-                other_mats[key] = material.ration(fraction)
-
-            #Heat capacity is called again since it should be lower now
-            T = Tf+(self.temperature-Tf)*exp(-ht/self.heat_capacity())
-            i+=1
-            if i>=len(bp):break
-            key,boil=bp[i]
-        self.temperature=T
+
+        order, boiling_point, enthalpy_vapor = self._get_boil_order()
+        boiled = np.zeros(n)
+        C_air = 1.2292875 #Heat capacity of air in J/L*K (near STP)
+        # Steps 2-4 run in a compiled kernel which takes the moles out of this vessel
+        self.temperature, n_boiled = _boil_off(self.temperature, Tf, ht, use_dQ, self.volume*C_air, self._mol[:n], 
+            order, self._molar_mass[:n], self._specific_heat[:n], boiling_point, enthalpy_vapor, boiled)
+        self._aggregates = None
+
+        self._add_to(other_vessel, order[:n_boiled], boiled)
         
         self.validate_solutes()
-        other_vessel.validate_solvents()
-        other_vessel.validate_solutes()
-
-        return other_vessel._handle_overflow()
+        return other_vessel._commit()
         
+    def _add_to(self, other_vessel, slots, amounts):
+        """
+        Adds amounts[slot] of the material in each slot to other_vessel, making a new material there if needed.
+        The amounts should already have been taken out of this vessel.
+        """
+        mdict, other_mats = self.material_dict, other_vessel.material_dict
+        keys = tuple(mdict)
+        for slot in slots:
+            key = keys[slot]
+            if key in other_mats:
+                other_mats[key].mol += amounts[slot]
+            else:
+                # Moles were already taken out, so only an empty copy of the material is needed
+                other_mats[key] = mdict[key].ration(0)
+                other_mats[key].mol = amounts[slot]
+
+    def _get_boil_order(self):
+        """
+        Returns the order in which the materials boil along with their boiling points and vaporization enthalpies.
+        These are cached until the materials in the vessel change.
+        """
+        if self._boil_order is None:
+            mats = self.material_dict.values()
+            boiling_point = np.array([mat._boiling_point for mat in mats], dtype=np.float64)
+            enthalpy_vapor = np.array([mat._enthalpy_vapor for mat in mats], dtype=np.float64)
+            self._boil_order = (np.argsort(boiling_point, kind="stable"), boiling_point, enthalpy_vapor)
+        return self._boil_order
+
     def _change_heat(self, dt, other_vessel, dQ) -> int:
         """
         Depricated function, consider using heat contact instead.
@@ -398,23 +1044,20 @@ class Vessel:
         """
         if fraction<1e-16:return 0
         fraction = np.clip(fraction,0,1)
-        other_mats=other_vessel.material_dict
-        #Iterate through each material in the vessel
-        for key,mat in self.material_dict.items():
-            if mat.is_solute() and len(self.solvents)>0:
-                self.solute_dict[key] *= (1-fraction)
-            # Update other vessel's material dict
-            if key in other_mats:
-                other_mats[key].mol+=mat.mol*fraction
-                mat.mol *= (1-fraction)
-            else:
-                # Get new material with the same class as mat using ration
-                other_mats[key] = mat.ration(fraction)
+        n, m = len(self.material_dict), len(other_vessel.material_dict)
+        # Find where each material goes in the other vessel
+        slots = _match_species(self._species[:n], other_vessel._species[:m])
+        if (slots<0).any():
+            other_mats=other_vessel.material_dict
+            for key,mat in self.material_dict.items():
+                if key not in other_mats:
+                    # Get an empty material with the same class as mat using ration
+                    other_mats[key] = mat.ration(0)
+            slots = _match_species(self._species[:n], other_vessel._species[:len(other_mats)])
+        _transfer(fraction, self._mol[:n], self._dissolved[:n, :len(self.solvents)], slots, other_vessel._mol)
+        self._aggregates = other_vessel._aggregates = None
 
-        # Rebuild the other vessel's solute dict if new solvents have been added
-        other_vessel.validate_solvents()
-        other_vessel.validate_solutes()
-        return other_vessel._handle_overflow()
+        return other_vessel._commit()
 
     def _pour_by_volume(self, dt, other_vessel, volume) -> int:
         """
@@ -435,44 +1078,20 @@ class Vessel:
         
         """
         if self.ignore_layout:return -2
-
-        other_mats=other_vessel.material_dict
-
-        drained_layers = self._hashed_layers[:n_pixel]
-        tot_pixels=len(self._hashed_layers)
-        for i,key in enumerate(self.solvents):
-            #NOTE mat is the solvent material
-            mat = self.material_dict[key]
-            drained_volume = (drained_layers==i).sum()/tot_pixels
-            if drained_volume<=1e-12:continue
-            #how much solvent is drained (percent wise)
-            fraction=np.clip(drained_volume/self._layers_volume[i],0,1)
-            if mat.litres<1e-12:
-                self.DEBUG=self._hashed_layers*1,self.solvents
-            #drain out the solvent
-            if key in other_mats:
-                d_mol=mat.mol*fraction
-                other_mats[key].mol+=d_mol
-                mat.mol -= d_mol
-            else:
-                other_mats[key] = mat.ration(fraction)
-            #drain the solutes
-            for u_key in self.solute_dict:
-                #NOTE u_mat is the solute material
-                u_mat = self.material_dict[u_key]
-                removed_amount = fraction*self.solute_dict[u_key][i]
-                #update the solute dict properly
-                self.solute_dict[u_key][i] -= removed_amount
-                if removed_amount<=1e-12:continue
-                #drain out the solute
-                if u_key in other_mats:
-                    other_mats[u_key].mol+=removed_amount
-                    u_mat.mol -= removed_amount
-                else:
-                    other_mats[u_key] = u_mat.ration(removed_amount/u_mat.mol)
-        other_vessel.validate_solvents()
-        other_vessel.validate_solutes()
-        return other_vessel._handle_overflow()
+        mdict = self.material_dict
+        n = len(mdict)
+        solute_mask = np.zeros(n, dtype=np.bool_)
+        for key in self.solute_dict:
+            solute_mask[mdict[key]._slot] = True
+        solvent_slots = np.array([mdict[key]._slot for key in self.solvents], dtype=np.int64)
+        drained, moved = np.zeros(n), np.zeros(n, dtype=np.int64)
+        _drain(self._hashed_layers[:n_pixel], len(self._hashed_layers), self._layers_volume, 
+            np.arange(len(self.solvents)), solvent_slots, solute_mask, self._mol[:n], 
+            self._dissolved[:n, :len(self.solvents)], drained, moved)
+        self._aggregates = None
+        slots = np.flatnonzero(moved)
+        self._add_to(other_vessel, slots[np.argsort(moved[slots])], drained)
+        return other_vessel._commit()
 
     def _mix(self, dt, other_vessel, t) -> int:
         """
@@ -482,45 +1101,20 @@ class Vessel:
         """
         if self.ignore_layout:return -2
         t=np.float32(t) #or replace dt
-        # Make air layer properties
-        d_air = 1.225 #in g/L
-        c_air = 0.65 #chosen color of air
-
-        #This is just to ensure the order of solutes does not change
-        s_names = tuple(s for s in self.solute_dict)
-        #Grab solute and solvent objects
-        solutes = tuple(self.material_dict[s] for s in s_names)
-        solvents = [self.material_dict[s] for s in self.solvents]
-        #Get solvent volumes
-        
-
-        solute_flag = sum(mat.mol for mat in solvents)<=1e-12
-        misc_mats = [mat for key,mat in self.material_dict.items() 
-            if (not mat.is_solvent()) and (solute_flag or not mat.is_solute())]
-
-        layer_mats=solvents+misc_mats
-
-        layer_volume = [mat.litres for mat in layer_mats]
-
-        self._layer_mats = layer_mats
+        n = len(self.material_dict)
+        # Slots of the solvents and the solutes (see _get_structure)
+        solvent_slots, solute_keys = self._get_structure()
+        (layer_slots, layer_volume, layer_density, self._layer_colors, solvent_polarity, solute_polarity,
+            solute_svolume) = _layer_properties(self.volume, self._mol[:n], self._phase[:n], self._molar_mass[:n],
+            self._density[:n], self._color[:n], self._polarity[:n], self._is_solute[:n], self._is_solvent[:n],
+            solvent_slots, solute_keys)
+        mats = tuple(self.material_dict.values())
+        self._layer_mats = [mats[i] for i in layer_slots]
 
-        # Add air to the end ov the volume list s.t it fills the remainder of the vessel
-        layer_volume = np.array(layer_volume+[self.volume - sum(layer_volume)], dtype=np.float32)
-        layer_density = np.array([mat.get_density() for mat in layer_mats]+[d_air], dtype=np.float32)
-        self._layer_colors = np.array([mat._color for mat in layer_mats]+[c_air], dtype=np.float32)
-        #Exclude air since it's not a solvent?
-        solvent_polarity = np.array([mat.polarity for mat in solvents], dtype=np.float32)
-
-        #Get solute properties
-        solute_polarity = np.array([mat.polarity for mat in solutes], dtype=np.float32)
-        #Hopefully this is the correct 2D array shape
-        if len(s_names)>0:
-            solute_amount = np.stack([self.solute_dict[a] for a in s_names]).astype(np.float32)
-        else:
-            solute_amount=np.zeros([0,len(solvents)],dtype=np.float32)
-
-        solute_svolume = np.array([mat.litres_per_mol for mat in solutes], dtype=np.float32)
-        
+        # separate.mix updates the dissolved amounts in place
+        solute_amount = self._dissolved[:n, :len(solvent_slots)]
+        prev = (solute_amount.copy(), self._layer_volumes, self._layers_position, getattr(self, "_layers_volume", None),
+            self._layers_variance, getattr(self, "_lvar", None))
         self._layers_position, self._layers_volume, self._layers_variance, self._variance, new_solute_amount, self._lvar = separate.mix(
             layer_volume,
             self._layer_volumes.astype(np.float32),
@@ -536,9 +1130,12 @@ class Vessel:
         )
 
         self._layer_volumes = layer_volume
-
-        for i,s in enumerate(s_names):
-            self.solute_dict[s] = new_solute_amount[i]
+        # Check if nothing moved (see push_event_to_queue)
+        # Solutes only stop moving for good if they have fewer than two solvents to move between
+        solutes_fixed = not solute_keys.any() or (self._mol[solvent_slots]>0).sum()<2
+        new = (new_solute_amount, layer_volume, self._layers_position, self._layers_volume, self._layers_variance, self._lvar)
+        self._mix_settled = t > 0 and solutes_fixed and all(
+            b is not None and np.array_equal(a, b) for a,b in zip(new, prev))
 
         return 0
    
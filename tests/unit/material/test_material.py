@@ -0,0 +1,58 @@
+import csv
+import os
+import tempfile
+
+from chemistrylab import material
+from copy import deepcopy
+from unittest import TestCase
+
+
+class MaterialTestCase(TestCase):
+    def test_material_table(self):
+        h2o = material.H2O()
+        self.assertEqual(h2o._density, {'s': None, 'l': 0.997, 'g': None})
+        self.assertTrue(h2o.is_solvent())
+        self.assertIsNone(material.O()._specific_heat)
+        self.assertIs(material.REGISTRY['H2O'], material.H2O)
+        # Rows added from another file get a class when they are first looked up
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "extra.csv")
+            columns = ["name", "density_s", "density_l", "density_g"]+list(material.MaterialTable.COLUMNS)
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, columns)
+                writer.writeheader()
+                writer.writerow(dict(name="test_species", density_l=0.8, molar_mass=50.0, phase="l", solvent=1))
+            material.MATERIAL_TABLE.add(path)
+        self.assertIn("test_species", material.REGISTRY)
+        mat = material.REGISTRY["test_species"](mol=2)
+        self.assertIsInstance(mat, material.TableMaterial)
+        self.assertEqual((mat._name, mat.mol, mat._molar_mass, mat.phase), ("test_species", 2, 50.0, 'l'))
+        self.assertTrue(mat.is_solvent())
+        self.assertIsNone(mat.get_index())
+        sid = material.get_species_id("test_species")
+        self.assertEqual(material.MATERIAL_TABLE.molar_mass[sid], 50.0)
+
+    def test_species_records(self):
+        na, other = material.Na(1.0), material.Na()
+        self.assertIs(na._record, other._record)
+        self.assertFalse(hasattr(na, "__dict__"))
+        # Setting a shared property only changes this material
+        na._boiling_point = 100
+        self.assertEqual(na._boiling_point, 100)
+        self.assertEqual(other._boiling_point, 1156.0)
+        part = na.ration(0.5)
+        self.assertIsInstance(part, material.Na)
+        self.assertEqual((part.mol, na.mol), (0.5, 0.5))
+        self.assertIs(deepcopy(other)._record, other._record)
+
+    def test_dissolution_maps(self):
+        dis = material.REGISTRY.dissolution("NaCl")
+        self.assertEqual(dis.names, ("Na", "Cl"))
+        self.assertEqual(list(dis.species), [material.get_species_id("Na"), material.get_species_id("Cl")])
+        self.assertEqual(list(dis.coefficients), [1.0, 1.0])
+        self.assertIs(material.REGISTRY.dissolution("NaCl"), dis)
+        # Both forms of precipitation rules give the same stoichiometry
+        for key in ("Na", "Cl"):
+            (requirements, results), = material.REGISTRY.precipitation(key)
+            self.assertEqual((requirements.names, results.names), (("Na", "Cl"), ("NaCl",)))
+        self.assertEqual(material.REGISTRY.dissolution("H2O").names, ("H2O",))
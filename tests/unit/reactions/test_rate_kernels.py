@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+import numpy as np
+from chemistrylab.reactions import rate_kernels
+from chemistrylab.reactions.reaction import (Reaction, arrhenius, mass_action_rates, mass_action_jacobian, newton_solve,
+    newton_solve_k)
+from chemistrylab.reactions.reaction_info import ReactInfo, REACTION_PATH
+from unittest import TestCase
+
+
+class RateKernelsTestCase(TestCase):
+    def test_rate_kernels(self):
+        info = ReactInfo.from_json(f"{REACTION_PATH}/chloro_wurtz.json")
+        source = rate_kernels.generate_source(info)
+        # Na appears squared in every reaction, zero coefficients are left out
+        self.assertIn("r0 = k[0] * c0 * c0 * c3 * c3", source)
+        self.assertNotIn("**", source)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            kernels = rate_kernels.compile_reaction(info, cache_dir)
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, f"_chemistrylab_rates_{kernels.key}.py")))
+            self.assertIs(rate_kernels.compile_reaction(info, cache_dir), kernels)
+        reaction = Reaction(info)
+        self.assertEqual(reaction.kernels.key, kernels.key)
+        k = reaction.rate_constants(350.0)
+        for conc in np.random.default_rng(6).random((3, len(info.MATERIALS))) - 0.2:
+            out, jac = np.empty(len(conc)), np.empty((len(conc), len(conc)))
+            kernels.rates(k, conc, out)
+            kernels.jacobian(k, conc, jac)
+            args = (reaction.stoich_coeff_arr, k, reaction.conc_coeff_arr, reaction.num_reagents, conc)
+            self.assertTrue(np.allclose(out, mass_action_rates(*args)))
+            self.assertTrue(np.allclose(jac, mass_action_jacobian(*args)))
+            rxn = np.empty(len(k))
+            kernels.reaction_rates(k, conc, rxn)
+            self.assertTrue(np.allclose(rxn, k * np.prod(np.clip(conc[:reaction.num_reagents], 0, None)
+                                                         ** reaction.stoich_coeff_arr[:, :reaction.num_reagents], axis=1)))
+        # The newton solver gives the same answer with the generated kernels
+        conc = np.random.default_rng(7).random(len(info.MATERIALS))
+        expected = newton_solve(reaction.stoich_coeff_arr, reaction.pre_exp_arr, reaction.activ_energy_arr,
+                                reaction.conc_coeff_arr, reaction.num_reagents, 350.0, conc.copy(), 0.5, 50)
+        actual = newton_solve_k(kernels.reaction_rates, arrhenius(reaction.pre_exp_arr, reaction.activ_energy_arr, 350.0),
+                                reaction.conc_coeff_arr, conc.copy(), 0.5, 50)
+        self.assertTrue(np.allclose(actual, expected))
+
+    def test_fractional_orders(self):
+        # Orders below one (including negative integers) keep the c**(p-1) factor of their derivative
+        info = ReactInfo.from_json(f"{REACTION_PATH}/chloro_wurtz.json")
+        stoich = np.array(info.stoich_coeff_arr, dtype=np.float64)
+        stoich[0, 0], stoich[1, 0] = -1, 0.5
+        info = info._replace(stoich_coeff_arr=stoich)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            kernels = rate_kernels.compile_reaction(info, cache_dir)
+        k = arrhenius(np.asarray(info.pre_exp_arr, dtype=np.float64), np.asarray(info.activ_energy_arr, dtype=np.float64), 350.0)
+        conc_coeff = np.asarray(info.conc_coeff_arr, dtype=np.float64)
+        for conc in np.random.default_rng(8).random((3, len(info.MATERIALS))) + 0.1:
+            out, jac = np.empty(len(conc)), np.empty((len(conc), len(conc)))
+            kernels.rates(k, conc, out)
+            kernels.jacobian(k, conc, jac)
+            args = (stoich, k, conc_coeff, len(info.REACTANTS), conc)
+            self.assertTrue(np.allclose(out, mass_action_rates(*args)))
+            self.assertTrue(np.allclose(jac, mass_action_jacobian(*args)))
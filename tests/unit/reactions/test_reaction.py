@@ -0,0 +1,92 @@
+import gymnasium as gym
+import chemistrylab
+import numpy as np
+from chemistrylab.reactions.reaction import Reaction, arrhenius, get_jacobian, get_rates, mass_action_jacobian
+from chemistrylab.reactions.reaction_info import ReactInfo, REACTION_PATH
+from scipy.integrate import solve_ivp
+from unittest import TestCase
+
+
+class ReactionTestCase(TestCase):
+    def test_react_batch(self):
+        env = gym.make("FictReact-v2").unwrapped
+        env.reset(seed=4)
+        reaction = env.default_events[0].parameter[0]
+        rng = np.random.default_rng(4)
+        n = rng.random((6, len(reaction.materials)))
+        n[2] = 0
+        temp, volume, dt = rng.uniform(280, 400, 6), rng.uniform(0.1, 1, 6), rng.uniform(0.5, 5, 6)
+        for solver in ("RK45", "newton", "RK23"):
+            reaction.solver = solver
+            new_n = reaction.react_batch(n, temp, volume, dt)
+            self.assertTrue(np.array_equal(new_n[2], n[2]))
+            for b in (0, 1, 3, 4, 5):
+                self.assertTrue(np.allclose(new_n[b], reaction.react(n[b], temp[b], volume[b], dt[b]), rtol=1e-8, atol=1e-12))
+
+    def test_rk45_batch(self):
+        # The compiled RK45 port used by react_batch gives scipy's RK45 answer, hot vessels take many steps
+        reaction = Reaction(ReactInfo.from_json(f"{REACTION_PATH}/chloro_wurtz.json"))
+        self.assertEqual(reaction.solver, "RK45")
+        rng = np.random.default_rng(3)
+        n = rng.random((4, len(reaction.materials))) + 0.1
+        temp, volume, dt = np.array([500.0, 700.0, 900.0, 1100.0]), rng.uniform(0.1, 1, 4), rng.uniform(5, 20, 4)
+        new_n = reaction.react_batch(n, temp, volume, dt)
+        for b in range(4):
+            reaction.temp = temp[b]
+            conc = solve_ivp(reaction, (0, dt[b]), n[b] / volume[b], method="RK45").y[:, -1]
+            expected = np.where(conc * volume[b] > reaction.threshold, conc * volume[b], 0)
+            self.assertTrue(np.allclose(new_n[b], expected, rtol=1e-10, atol=1e-12))
+
+    def test_rosenbrock(self):
+        rng = np.random.default_rng(2)
+        for fn in ("chloro_wurtz", "precipitation"):
+            reaction = Reaction(ReactInfo.from_json(f"{REACTION_PATH}/{fn}.json"), solver="rosenbrock")
+            self.assertEqual(reaction.solver, "rosenbrock")
+            args = (reaction.stoich_coeff_arr, reaction.pre_exp_arr, reaction.activ_energy_arr,
+                    reaction.conc_coeff_arr, reaction.num_reagents, 450.0)
+            n = rng.random(len(reaction.materials)) + 0.1
+            # analytic jacobian against central differences
+            eye = np.eye(len(n)) * 1e-7
+            jac = np.array([(get_rates(*args, n + e) - get_rates(*args, n - e)) / 2e-7 for e in eye]).T
+            self.assertTrue(np.allclose(get_jacobian(*args, n), jac, rtol=1e-5, atol=1e-8))
+            # precipitation is stiff (k=1e4), explicit solvers need tiny steps for it
+            reaction.temp = 450.0
+            ref = solve_ivp(reaction, (0, 5), n, method="Radau", rtol=1e-10, atol=1e-13).y[:, -1]
+            new_n = reaction.react(n, 450.0, 1.0, 5)
+            self.assertTrue(np.allclose(new_n, ref, rtol=1e-2, atol=1e-4))
+            self.assertTrue(np.allclose(reaction.react_batch(n[None], 450.0, 1.0, 5)[0], new_n))
+
+    def test_scipy_jacobian(self):
+        info = ReactInfo.from_json(f"{REACTION_PATH}/chloro_wurtz.json")
+        n = np.random.default_rng(3).random(len(info.MATERIALS)) + 0.1
+        expected = Reaction(info, solver="RK45").react(n, 400.0, 1.0, 2)
+        for solver in ("Radau", "BDF", "LSODA"):
+            reaction = Reaction(info, solver=solver)
+            self.assertEqual(reaction.solver, solver)
+            reaction.temp = 400.0
+            jac = reaction.jacobian(0, n)
+            args = (reaction.stoich_coeff_arr, reaction._k, reaction.conc_coeff_arr, reaction.num_reagents, n)
+            self.assertTrue(np.allclose(jac, mass_action_jacobian(*args)))
+            self.assertTrue(np.allclose(reaction.react(n, 400.0, 1.0, 2), expected, rtol=1e-2, atol=1e-4))
+
+    def test_rate_constant_cache(self):
+        reaction = Reaction(ReactInfo.from_json(f"{REACTION_PATH}/chloro_wurtz.json"))
+        reaction.k_cache_size = 2
+        k = reaction.rate_constants(300.0)
+        self.assertTrue(np.allclose(k, reaction.pre_exp_arr * np.exp(-reaction.activ_energy_arr / (8.314462619 * 300))))
+        self.assertIs(reaction.rate_constants(300.0), k)
+        # nearby temperatures get their own constants, computed at the exact temperature
+        k2 = reaction.rate_constants(300.0 + 1e-8)
+        self.assertIsNot(k2, k)
+        np.testing.assert_array_equal(k2, arrhenius(reaction.pre_exp_arr, reaction.activ_energy_arr, 300.0 + 1e-8))
+        self.assertIs(reaction.rate_constants(300.0), k)
+        reaction.rate_constants(310.0)
+        reaction.rate_constants(300.0)
+        reaction.rate_constants(320.0)
+        # 310K was the least recently used temperature
+        self.assertEqual(len(reaction._k_cache), 2)
+        self.assertIs(reaction.rate_constants(300.0), k)
+        reaction.temp = 320.0
+        n = np.random.default_rng(5).random(len(reaction.materials))
+        self.assertTrue(np.allclose(reaction(0, n), get_rates(reaction.stoich_coeff_arr, reaction.pre_exp_arr,
+            reaction.activ_energy_arr, reaction.conc_coeff_arr, reaction.num_reagents, 320.0, n)))
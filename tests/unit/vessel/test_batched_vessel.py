@@ -0,0 +1,79 @@
+import gymnasium as gym
+import chemistrylab
+import numpy as np
+from chemistrylab import vessel, material
+from chemistrylab.batched_vessel import BatchedVessel
+from copy import deepcopy
+from unittest import TestCase
+
+
+class BatchedVesselTestCase(TestCase):
+    def test_batched_vessel(self):
+        envs = [gym.make("GenWurtzExtract-v2").unwrapped for _ in range(2)]
+        for seed, env in enumerate(envs):
+            env.reset(seed=seed+1)
+        sources = [env.shelf[0] for env in envs]
+        targets = [env.shelf[1] for env in envs]
+        self.assertFalse(any(v.material_dict for v in targets))
+        species = tuple(dict.fromkeys(key for v in sources for key in v.material_dict))
+        events = [("mix", (-1,)), ("mix", (0.1,)), ("pour by percent", (0.3,)), ("drain by pixel", (20,)),
+                  ("heat contact", (400, 20))]
+        for name, param in events:
+            src, tgt = deepcopy(sources), deepcopy(targets)
+            src_batch = BatchedVessel.from_vessels(src, species)
+            # The targets start empty, so they share the column templates (and solute flags) of the sources
+            tgt_batch = BatchedVessel(src_batch._templates, len(tgt), temperature=tgt[0].temperature, volume=tgt[0].volume)
+            other = tgt_batch if name != "mix" else None
+            status = src_batch.push_event_to_queue([vessel.Event(name, param, other)], dt=0.01)
+            for b, (v1, v2) in enumerate(zip(src, tgt)):
+                other = v2 if name != "mix" else None
+                self.assertEqual(v1.push_event_to_queue([vessel.Event(name, param, other)], dt=0.01), list(status[:, b]))
+                for v, batch in ((v1, src_batch), (v2, tgt_batch)):
+                    w = batch.get_vessel(b)
+                    for key, mat in v.material_dict.items():
+                        self.assertAlmostEqual(mat.mol, w.material_dict[key].mol, places=6)
+                    for key, arr in v.solute_dict.items():
+                        np.testing.assert_allclose(arr, w.solute_dict[key], atol=1e-5)
+                # The layer images are sampled, so only compare the layer volumes
+                cols = [species.index(mat._name) for mat in v1._layer_mats] + [len(species)]
+                np.testing.assert_allclose(v1._layers_volume, src_batch._layers_volume[b, cols], atol=1e-5)
+
+    def test_per_vessel_properties(self):
+        # Vessels keep their own material properties (like the Na set up by extract_bench.wurtz_vessel)
+        vessels = []
+        for polarity in [2.0, None]:
+            Na = material.Na(mol=0.5)
+            Na.set_solute_flag(True)
+            if polarity is not None:
+                Na.set_color(0.0)
+                Na.polarity = polarity
+                Na._boiling_point = material.NaCl()._boiling_point
+            v = vessel.Vessel("source")
+            v.material_dict = {"H2O": material.H2O(mol=2), "C6H14": material.C6H14(mol=0.5), "Na": Na}
+            v.validate_solvents()
+            v.validate_solutes()
+            vessels.append(v)
+        batch = BatchedVessel.from_vessels(vessels)
+        c = batch.species.index("Na")
+        self.assertEqual(list(batch.polarity[:, c]), [2.0, material.Na().polarity])
+        self.assertEqual(list(batch.color[:, c]), [0.0, material.Na()._color])
+        for b, v in enumerate(vessels):
+            Na = batch.get_vessel(b).material_dict["Na"]
+            self.assertEqual(Na.polarity, v.material_dict["Na"].polarity)
+            self.assertEqual(Na._boiling_point, v.material_dict["Na"]._boiling_point)
+            self.assertEqual(Na._color, v.material_dict["Na"]._color)
+        # Like Material.ration, materials poured into an empty vessel get the default properties of their class
+        targets = [vessel.Vessel("target") for _ in vessels]
+        target_batch = BatchedVessel(batch._templates, len(targets))
+        status = batch.push_event_to_queue([vessel.Event("pour by percent", (0.5,), target_batch),
+                                            vessel.Event("mix", (-1,), None)], dt=0.01)
+        self.assertEqual(list(target_batch.polarity[:, c]), [material.Na().polarity]*2)
+        for b, (v1, v2) in enumerate(zip(vessels, targets)):
+            expected = v1.push_event_to_queue([vessel.Event("pour by percent", (0.5,), v2),
+                                               vessel.Event("mix", (-1,), None)], dt=0.01)
+            self.assertEqual(expected, list(status[:, b]))
+            for key, arr in v1.solute_dict.items():
+                np.testing.assert_allclose(arr, batch.get_vessel(b).solute_dict[key], atol=1e-5)
+            self.assertEqual(target_batch.get_vessel(b).material_dict["Na"].polarity, v2.material_dict["Na"].polarity)
+        # Na dissolves differently into the solvents depending on its polarity
+        self.assertFalse(np.allclose(batch.dissolved[0, c], batch.dissolved[1, c]))
@@ -0,0 +1,197 @@
+import gymnasium as gym
+import chemistrylab
+import numpy as np
+from chemistrylab import vessel, material
+from copy import deepcopy
+from unittest import TestCase
+
+
+class VesselTestCase(TestCase):
+    def test_settled_fast_path(self):
+        env = gym.make("GenWurtzExtract-v2")
+        env.reset(seed=1)
+        v = env.unwrapped.shelf[0]
+        v.push_event_to_queue([vessel.Event("mix", (-1,), None)], dt=0.01)
+        for _ in range(10):
+            v.push_event_to_queue(dt=0.5)
+        # The settled snapshot only covers the mixing time it was made with
+        self.assertTrue(v._is_settled(0.5))
+        self.assertFalse(v._is_settled(0.2))
+        fast, slow = deepcopy(v), deepcopy(v)
+        for dt in [0.5, 0.5, 0.2, 0.5, 0]:
+            fast.push_event_to_queue(dt=dt)
+            slow._settled = None
+            slow.push_event_to_queue(dt=dt)
+            self.assertEqual(fast._variance, slow._variance)
+            for attr in ["_layers_position", "_lvar", "_layers_volume", "_dissolved", "_mol"]:
+                np.testing.assert_array_equal(getattr(fast, attr), getattr(slow, attr))
+        # Changing any property the layers are worked out from means the vessel has to be mixed again
+        changes = [lambda mat: setattr(mat, "polarity", mat.polarity+1), lambda mat: mat.set_color(0.3),
+                   lambda mat: setattr(mat, "_density", {"s": 3.0, "l": 3.0, "g": 3.0}),
+                   lambda mat: setattr(mat, "_molar_mass", 2*mat._molar_mass), lambda mat: mat.set_solute_flag(False)]
+        for change in changes:
+            w = deepcopy(v)
+            w.push_event_to_queue(dt=0.5)
+            self.assertTrue(w._is_settled(0.5))
+            change(next(iter(w.material_dict.values())))
+            self.assertFalse(w._is_settled(0.5))
+
+    def test_cached_aggregates(self):
+        for env_id in ["GenWurtzDistill-v2", "WaterOilExtract-v0"]:
+            env = gym.make(env_id)
+            env.reset(seed=4)
+            for _ in range(20):
+                env.step(env.action_space.sample())
+                for v in env.unwrapped.shelf:
+                    mats = v.material_dict.values()
+                    self.assertEqual(v.filled_volume(), sum(mat.litres for mat in mats))
+                    self.assertEqual(v.heat_capacity(), v.volume*1.2292875+sum(mat.heat_capacity for mat in mats))
+        # Setting a species property on a material in a vessel updates the vessel's arrays and caches
+        v1, v2 = vessel.Vessel("boiler"), vessel.Vessel("condenser")
+        v1.material_dict = {"dodecane": material.Dodecane(mol=1), "C6H14": material.C6H14(mol=1)}
+        v1.filled_volume(), v1._get_boil_order()
+        dodecane = v1.material_dict["dodecane"]
+        dodecane._density = {"s": None, "l": 0.5, "g": None}
+        dodecane._molar_mass = 100.0
+        dodecane._boiling_point = 300.0
+        self.assertEqual(v1.filled_volume(), sum(mat.litres for mat in v1.material_dict.values()))
+        self.assertAlmostEqual(v1.filled_volume(), 0.2 + v1.material_dict["C6H14"].litres)
+        v1.push_event_to_queue([vessel.Event("heat contact", (330, 50), v2)], dt=0.01)
+        # dodecane now boils before hexane
+        self.assertGreater(v2.material_dict["dodecane"].mol, 0)
+        self.assertNotIn("C6H14", v2.material_dict)
+
+    def test_heat_contact(self):
+        v1, v2 = vessel.Vessel("boiler"), vessel.Vessel("condenser")
+        v1.material_dict = {"dodecane": material.Dodecane(mol=1), "C6H14": material.C6H14(mol=1)}
+        v1.push_event_to_queue([vessel.Event("heat contact", (1000, 50), v2)], dt=0.01)
+        # hexane boils off well before dodecane
+        self.assertTrue(342 < v1.temperature < 1000)
+        self.assertAlmostEqual(v2.material_dict["C6H14"].mol, 1)
+        self.assertAlmostEqual(v1.material_dict["C6H14"].mol, 0)
+        self.assertAlmostEqual(v1.material_dict["dodecane"].mol, 1)
+        self.assertNotIn("dodecane", v2.material_dict)
+
+    def test_event_queue(self):
+        # A queue of pours runs the same as its events one at a time, whether or not the target overflows
+        # (solutes are redistributed into the target's solvents after every pour)
+        for target_volume in [0.03, 0.05]:
+            Na = material.Na(mol=0.5)
+            Na.set_solute_flag(True)
+            v1, v2 = vessel.Vessel("source", volume=1), vessel.Vessel("target", volume=target_volume)
+            v1.material_dict = {"C6H14": material.C6H14(mol=0.2), "Na": Na}
+            v1.validate_solvents()
+            v1.validate_solutes()
+            v2.material_dict = {"H2O": material.H2O(mol=1)}
+            v2.validate_solvents()
+            v3, v4 = deepcopy(v1), deepcopy(v2)
+            events = [vessel.Event("pour by percent", (0.3,), v2), vessel.Event("pour by percent", (0.5,), v2),
+                      vessel.Event("pour by volume", (0.002,), v2)]
+            status = v1.push_event_to_queue(events, dt=0.01, update_layers=False)
+            expected = [v3._pour_by_percent(0.01, v4, 0.3), v3._pour_by_percent(0.01, v4, 0.5),
+                        v3._pour_by_volume(0.01, v4, 0.002)]
+            self.assertEqual(status, expected)
+            self.assertEqual(-1 in status, target_volume < 0.05)
+            for a,b in [(v1,v3),(v2,v4)]:
+                self.assertEqual(list(a.material_dict), list(b.material_dict))
+                n = len(a.material_dict)
+                np.testing.assert_array_equal(a._mol[:n], b._mol[:n])
+                np.testing.assert_array_equal(a._dissolved[:n], b._dissolved[:n])
+        self.assertEqual(v1.push_event_to_queue([vessel.Event("mix", (-1,), None)]*3, dt=0.01), [0,0,0])
+
+    def test_dissolved_in_place(self):
+        env = gym.make("GenWurtzExtract-v2")
+        env.reset(seed=0)
+        v = env.unwrapped.shelf[0]
+        dissolved = v._dissolved
+        v.push_event_to_queue([vessel.Event("mix", (-1,), None), vessel.Event("mix", (0.1,), None)], dt=0.01)
+        # Mixing and validation update the dissolved amounts without making a new matrix
+        self.assertIs(v._dissolved, dissolved)
+        for key, arr in v.solute_dict.items():
+            self.assertTrue(np.shares_memory(arr, dissolved))
+            self.assertAlmostEqual(arr.sum(), v.material_dict[key].mol, places=5)
+
+    def test_new_solvent_slots(self):
+        v1, v2 = vessel.Vessel("a"), vessel.Vessel("b")
+        Na = material.Na(mol=1)
+        Na.set_solute_flag(True)
+        v1.material_dict = {"H2O": material.H2O(mol=5), "Na": Na}
+        v1.validate_solvents()
+        v1.validate_solutes()
+        v2.material_dict = {"diethyl ether": material.DiEthylEther(mol=1)}
+        dissolved = v1._dissolved
+        v2.push_event_to_queue([vessel.Event("pour by percent", (1,), v1)])
+        # The new solvent takes the next column, the water column does not move
+        self.assertEqual(v1.solvents, ("H2O", "diethyl ether"))
+        self.assertEqual(v1.solvent_dict, {"H2O": 0, "diethyl ether": 1})
+        self.assertIs(v1._dissolved, dissolved)
+        self.assertAlmostEqual(v1.solute_dict["Na"][0], 1)
+        self.assertEqual(v1.solute_dict["Na"][1], 0)
+
+    def test_pour_by_percent(self):
+        v1, v2 = vessel.Vessel("a"), vessel.Vessel("b")
+        Na = material.Na(mol=1)
+        Na.set_solute_flag(True)
+        v1.material_dict = {"H2O": material.H2O(mol=4), "Na": Na}
+        v1.validate_solvents()
+        v1.validate_solutes()
+        v2.material_dict = {"H2O": material.H2O(mol=1)}
+        self.assertEqual(v1.push_event_to_queue([vessel.Event("pour by percent", (0.25,), v2)]), [0])
+        self.assertAlmostEqual(v1.material_dict["H2O"].mol, 3)
+        self.assertAlmostEqual(v2.material_dict["H2O"].mol, 2)
+        self.assertAlmostEqual(v1.material_dict["Na"].mol, 0.75)
+        self.assertAlmostEqual(v2.material_dict["Na"].mol, 0.25)
+        self.assertAlmostEqual(v1.solute_dict["Na"][0], 0.75, places=6)
+        self.assertAlmostEqual(v2.solute_dict["Na"][0], 0.25, places=6)
+
+    def test_drain_by_pixel(self):
+        env = gym.make("GenWurtzExtract-v2")
+        env.reset(seed=1)
+        v1, v2 = env.unwrapped.shelf[0], env.unwrapped.shelf[1]
+        v1.push_event_to_queue([vessel.Event("mix", (1,), None)], dt=0.01)
+        totals = {key: mat.mol + (v2.material_dict[key].mol if key in v2.material_dict else 0)
+            for key, mat in v1.material_dict.items()}
+        v1.push_event_to_queue([vessel.Event("drain by pixel", (20,), v2)], dt=0.01)
+        for key, total in totals.items():
+            self.assertAlmostEqual(v1.material_dict[key].mol + v2.material_dict[key].mol, total)
+        for key, arr in v1.solute_dict.items():
+            self.assertAlmostEqual(arr.sum(), v1.material_dict[key].mol, places=5)
+
+    def test_commit(self):
+        env = gym.make("GenWurtzExtract-v2")
+        env.reset(seed=1)
+        v1 = env.unwrapped.shelf[0]
+        v1.push_event_to_queue([vessel.Event("mix", (1,), None)], dt=0.01)
+        v2 = deepcopy(v1)
+        # Break the dissolved amounts and overfill, then compare against the separate checks
+        for v in (v1, v2):
+            v._dissolved[:len(v.material_dict)] *= 1.5
+            v._mol[:len(v.material_dict)] *= 3
+            v._aggregates = None
+        v1.validate_solvents()
+        v1.validate_solutes()
+        self.assertEqual(v1._handle_overflow(), v2._commit())
+        np.testing.assert_allclose(v1._mol, v2._mol)
+        np.testing.assert_allclose(v1._dissolved, v2._dissolved, rtol=1e-6)
+        # Solvent and solute changes still rebuild the dicts
+        key = next(iter(v2.solute_dict))
+        v2.material_dict[key].set_solvent_flag(True)
+        v2._commit()
+        self.assertIn(key, v2.solvents)
+        self.assertNotIn(key, v2.solute_dict)
+
+    def test_layer_properties(self):
+        env = gym.make("GenWurtzExtract-v2")
+        env.reset(seed=1)
+        v = env.unwrapped.shelf[0]
+        v.push_event_to_queue([vessel.Event("mix", (1,), None)], dt=0.01)
+        layer_mats = v._layer_mats
+        self.assertEqual([mat._name for mat in layer_mats[:len(v.solvents)]], list(v.solvents))
+        np.testing.assert_allclose(v._layer_volumes[:-1], [mat.litres for mat in layer_mats], rtol=1e-6)
+        np.testing.assert_allclose(v._layer_colors[:-1], [mat._color for mat in layer_mats], rtol=1e-6)
+        # Polarity is kept in the vessel arrays while a material is in a vessel
+        mat = layer_mats[0]
+        mat.polarity = 0.5
+        self.assertEqual(v._polarity[mat._slot], 0.5)
+        del v.material_dict[mat._name]
+        self.assertEqual(mat.polarity, 0.5)